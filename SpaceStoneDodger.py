@@ -3,6 +3,8 @@
 
 
 import sys
+import time as t
+GAME_START = t.perf_counter() # Used to measure the time to the first frame
 sys.path.append("src")
 
 import pygame
@@ -13,6 +15,8 @@ from src import ssd_scene_gamelevel as SceneLevel
 from src import ssd_scene_gamelosingscreen as SceneLose
 from src import ssd_scene_gameoptions as SceneOptions
 from src import ssd_scene_gamecredits as SceneCredits
+import ssd_scene_registry as Reg # same module tree the scenes use
+import ssd_scene_master_class as Scn
 
 
 
@@ -22,35 +26,39 @@ pygame.init()
 
 def main_game():
     # Defining our game window
-    WIN = CST.MAIN_DISPLAY
+    WIN = CST.get_display()
     pygame.display.set_caption("Space Stone Dodger!")
 
-    game_menu = SceneMenu.GameMenu(WIN)
-    game_tutorial = SceneTutorial.GameTutorial(WIN)
-    game_level = SceneLevel.GameLevel(WIN)
-    game_losing_screen = SceneLose.GameLosingScreen(WIN)
-    game_options = SceneOptions.GameOptions(WIN)
-    game_credits = SceneCredits.GameCredits(WIN)
-
-    scenelist = [
-        game_menu,
-        game_tutorial,
-        game_level,
-        game_losing_screen,
-        game_options,
-        game_credits
-    ]
-
-    next_scene = CST.SCENES.GAME_MENU
+    # Scenes are built the first time they're needed, likely next ones are prebuilt while idle
+    SCN = CST.SCENES
+    Scn.Scene.start_time = GAME_START # Scene.run() logs the time to the first frame when profiling
+    scenes = Reg.SceneRegistry(WIN)
+    scenes.register(SCN.GAME_MENU, SceneMenu.GameMenu, (SCN.GAME_LEVEL, SCN.GAME_TUTORIAL, SCN.GAME_OPTIONS))
+    scenes.register(SCN.GAME_TUTORIAL, SceneTutorial.GameTutorial, (SCN.GAME_LEVEL, SCN.GAME_MENU))
+    # Building the next scenes would hitch gameplay frames (the credits alone take ~14ms), so only their assets
+    scenes.register(SCN.GAME_LEVEL, SceneLevel.GameLevel, (SCN.GAME_LOSING_SCREEN, SCN.GAME_CREDITS), prebuild_next=False)
+    scenes.register(SCN.GAME_LOSING_SCREEN, SceneLose.GameLosingScreen, (SCN.GAME_LEVEL, SCN.GAME_MENU))
+    scenes.register(SCN.GAME_OPTIONS, SceneOptions.GameOptions, (SCN.GAME_MENU,))
+    scenes.register(SCN.GAME_CREDITS, SceneCredits.GameCredits, (SCN.GAME_MENU,))
 
     # Scene sequence, each scene returns the index for the next one
+    next_scene = SCN.GAME_MENU
     while True:
-        next_scene = scenelist[next_scene].run()
+        next_scene = scenes.run(next_scene)
+
+
+
+def dump_profiling() -> None:
+    """ Writes the per-frame timings and logs the CPU usage of the last run of each scene """
+    Scn.Scene.profiler.dump(CST.PROFILE_DUMP_FILE)
+    for scene_name, cpu_usage in Scn.Scene.cpu_usage_by_scene.items():
+        print(f"CPU usage of {scene_name}: {cpu_usage:.1f}%")
 
 
 
 if __name__ == "__main__":
-    #import cProfile
-    #cProfile.run('main_game()', "new_stats.dat")
+    if CST.PROFILING: # SSD_PROFILE=1 dumps per-frame timings when the game closes
+        import atexit
+        atexit.register(dump_profiling)
     main_game()
     
\ No newline at end of file
@@ -3,32 +3,49 @@
 # SpaceStoneDodger: Asteroid and Asteroid Field Classes
 
 import pygame
-from random import randint
 import ssd_constants as CST
 from ssd_constants import pressed
 import ssd_field as fld
+import ssd_field_numpy as fnp
+import ssd_collision as col
+import ssd_sprite_cache as spc
+import ssd_event_bus as evb
 
 
 
 class Asteroid(pygame.sprite.Sprite):
     """ Asteroid Class: a single asteroid object """
 
-    # Class constants
-    SPRITE_IMAGE = CST.ASTEROID_SPRITE
-    HEIGHT = SPRITE_IMAGE.get_height()
-    WIDTH = SPRITE_IMAGE.get_width()
+    # Class constants, filled by load_sprite() on first use
+    SPRITE_IMAGE = None
+    HEIGHT = 0
+    WIDTH = 0
+    SCALED_SPRITES = None
 
     external_speed_modifier = 1
 
-    def __init__(self, x: int, y: int, speed: int) -> None:
-        self.set_scale(randint(24, 128))
+    @classmethod
+    def load_sprite(cls) -> None:
+        """ Loads the shared sprite and its scaled copies cache, only the first time """
+        if cls.SPRITE_IMAGE is not None:
+            return
+        cls.SPRITE_IMAGE = CST.AssetManager.get_image("asteroid.png")
+        cls.HEIGHT = cls.SPRITE_IMAGE.get_height()
+        cls.WIDTH = cls.SPRITE_IMAGE.get_width()
+        cls.SCALED_SPRITES = spc.ScaledSpriteCache(cls.SPRITE_IMAGE, CST.ASTEROID_SCALE_QUANTUM)
+
+
+    def __init__(self, x: int, y: int, speed: int, scale: int = CST.ASTEROID_MAX_SCALE) -> None:
+        """ Random sizes are up to the field, so every spawn draws the same random numbers """
+        Asteroid.load_sprite()
+        self.set_scale(scale)
         self.relocate(x, y, speed)
 
 
     def set_scale(self, new_scale: int) -> None:
-        """ Sets a fixed scale for this asteroid """
-        self.scale = new_scale
-        self.this_sprite_image = pygame.transform.scale(Asteroid.SPRITE_IMAGE, (self.scale, self.scale))
+        """ Sets a fixed scale for this asteroid, the sprite comes from the shared cache """
+        self.scale = Asteroid.SCALED_SPRITES.quantize(new_scale)
+        self.this_sprite_image = Asteroid.SCALED_SPRITES.get(self.scale)
         self.radius = self.scale // 2 - self.scale//32 # Collision radius is 1/32 smaller than the sprite to help player
         self.rect = self.this_sprite_image.get_rect()
 
@@ -40,10 +57,19 @@ class Asteroid(pygame.sprite.Sprite):
         self.speed = speed
 
 
-    def game_tick_update(self, window: pygame.Surface) -> None:
+    def move(self) -> None:
         """ Moves the asteroid left """
         self.x -= self.speed * Asteroid.external_speed_modifier
         self.rect.x, self.rect.y = self.x, self.y
+
+
+    def blit_data(self) -> tuple:
+        """ Returns the (surface, position) pair to draw, fields batch them into one blits() call """
+        return (self.this_sprite_image, (self.x, self.y))
+
+
+    def game_tick_update(self, window: pygame.Surface) -> None:
+        self.move()
         window.blit(self.this_sprite_image, (self.x, self.y))
 
 
@@ -55,8 +81,9 @@ class Asteroid(pygame.sprite.Sprite):
 
 class AsteroidField(fld.Field_of):
 
-    def __init__(self, howmany, player):
+    def __init__(self, howmany, player, stream_name: str = None):
         self.player = player
+        Asteroid.load_sprite()
         self.Y_OFFSET = Asteroid.HEIGHT // 2
         self.spawn_parameters = {
             "x_from": CST.SCREEN_WIDTH,
@@ -66,7 +93,14 @@ class AsteroidField(fld.Field_of):
             "min_speed": CST.ASTEROID_STARTING_MIN_SPEED,
             "max_speed": CST.ASTEROID_STARTING_MAX_SPEED,
         }
-        super().__init__(Asteroid, howmany, self.spawn_parameters)
+        super().__init__(Asteroid, howmany, self.spawn_parameters, stream_name)
+
+
+    def new_element(self):
+        """ New and pooled asteroids alike draw their size once, right after their position """
+        element = super().new_element()
+        element.set_scale(self.rng.randint(CST.ASTEROID_MIN_SCALE, CST.ASTEROID_MAX_SCALE))
+        return element
 
 
     def handle_movement(self, keys_pressed: list) -> None:
@@ -78,11 +112,74 @@ class AsteroidField(fld.Field_of):
         Asteroid.external_speed_modifier = speed_modifier
         
 
-    def other_stuff_for_each(self, element):
+    def other_stuff_for_all(self):
         """ Overriding from super() class to add collision checking """
-        # Collisions checking
-        if pygame.sprite.collide_circle(element, self.player):
-            pygame.event.post(pygame.event.Event(CST.PLAYER_HIT))
+        if self.player.is_invulnerable(): # Hits wouldn't count anyway
+            return
+        for index in self.colliding_with(self.player): # One hit per frame, whatever the overlaps
+            element = self.elements[index]
+            evb.post(self.event_bus, CST.PLAYER_HIT, coalesce=True, source=element, x=element.x, y=element.y)
+
+
+
+class ArrayAsteroidField(fnp.ArrayField_of):
+    """ AsteroidField on the NumPy backend, meant for swarms of thousands of asteroids """
+
+    def __init__(self, howmany, player, stream_name: str = None):
+        self.player = player
+        Asteroid.load_sprite()
+        self.Y_OFFSET = Asteroid.HEIGHT // 2
+        spawn_parameters = {
+            "x_from": CST.SCREEN_WIDTH,
+            "x_to": CST.SCREEN_WIDTH * 2,
+            "y_from": 0 - self.Y_OFFSET,
+            "y_to": CST.SCREEN_HEIGHT - self.Y_OFFSET,
+            "min_speed": CST.ASTEROID_STARTING_MIN_SPEED,
+            "max_speed": CST.ASTEROID_STARTING_MAX_SPEED,
+        }
+        super().__init__(howmany, spawn_parameters, stream_name)
+
+
+    def scale_range(self) -> tuple:
+        return (CST.ASTEROID_MIN_SCALE, CST.ASTEROID_MAX_SCALE) # Same draw as AsteroidField.new_element()
+
+
+    def new_scales(self, drawn):
+        scales = drawn.astype(fnp.np.int64)
+        quantum = Asteroid.SCALED_SPRITES.quantum # Same buckets as Asteroid.set_scale()
+        return fnp.np.maximum(quantum, (scales + quantum // 2) // quantum * quantum)
+
+
+    def radius_for(self, scales):
+        return scales // 2 - scales // 32 # Same as Asteroid.set_scale()
+
+
+    def element_surface(self, scale: int) -> pygame.Surface:
+        return Asteroid.SCALED_SPRITES.get(scale)
+
+
+    def handle_movement(self, keys_pressed: list) -> None:
+        """ Manages the speed modifier of the field based on key pressing """
+        self.speed_modifier = 1
+        if pressed("SPACE", keys_pressed): # Acceleration
+            self.speed_modifier = CST.BOOST_SPEED_MODIFIER
+
+
+    def colliding_with(self, target) -> list:
+        """ Returns the indices of every asteroid overlapping target """
+        np = fnp.np
+        # Rects round half away from zero, centers are the rect position plus half the size
+        center_x = (np.copysign(np.floor(np.abs(self.x) + 0.5), self.x)).astype(np.int64) + self.scale // 2
+        center_y = (np.copysign(np.floor(np.abs(self.y) + 0.5), self.y)).astype(np.int64) + self.scale // 2
+        return col.circle_hits(center_x, center_y, self.radius, target)
+
+
+    def other_stuff_for_all(self) -> None:
+        """ Collision checking of the whole field against the player """
+        if self.player.is_invulnerable(): # Hits wouldn't count anyway
+            return
+        for index in self.colliding_with(self.player): # One hit per frame, whatever the overlaps
+            evb.post(self.event_bus, CST.PLAYER_HIT, coalesce=True, source=int(index), x=self.x[index], y=self.y[index])
 
 
 
@@ -16,4 +16,7 @@ class Background:
 
 
     def game_tick_update(self, window) -> None:
+        if hasattr(window, "restore_background"): # Dirty rendering: only what got drawn over
+            window.restore_background(self.bg)
+            return
         window.blit(self.bg, (0,0))
\ No newline at end of file
@@ -0,0 +1,49 @@
+# SpaceStoneDodger: Simulation Checksums
+# A CRC of the level simulation state every N frames: two runs that are meant to be
+# identical (a replay, another field backend, pooling on/off...) must give the same list
+
+import struct
+import zlib
+from itertools import chain
+
+
+
+PLAYER_STATE = struct.Struct("<ddii") # x, y, health, invul_timer
+LEVEL_STATE = struct.Struct("<iii") # timeline seconds, frames into the current second, score
+
+
+def state_checksum(level) -> int:
+    """ CRC32 of player, field elements, timeline cursor and score of a GameLevel
+        Elements are sorted, so fields storing them in a different order still match """
+    player = level.player
+    crc = zlib.crc32(PLAYER_STATE.pack(player.x, player.y, player.health, player.invul_timer))
+    for field in (level.asteroid_field, level.powerup_field):
+        elements = field.get_state()
+        crc = zlib.crc32(struct.pack(f"<{3 * len(elements)}d", *chain.from_iterable(elements)), crc)
+    return zlib.crc32(LEVEL_STATE.pack(level.timer_seconds_passed, level.game_timer, level.score), crc)
+
+
+def first_divergence(expected: list, actual: list, interval: int) -> int:
+    """ Returns the first frame where two checksum lists differ, None if they match """
+    for position, (expected_crc, actual_crc) in enumerate(zip(expected, actual)):
+        if expected_crc != actual_crc:
+            return (position + 1) * interval
+    if len(expected) != len(actual): # One run went on longer
+        return (min(len(expected), len(actual)) + 1) * interval
+    return None
+
+
+
+class ChecksumLog:
+    """ Checksums of a level every interval frames, call frame_done() after every frame """
+
+    def __init__(self, interval: int) -> None:
+        self.interval = interval
+        self.frames = 0
+        self.checksums = [] # The first is for frame interval, then 2 * interval, and so on
+
+
+    def frame_done(self, level) -> None:
+        self.frames += 1
+        if self.interval and self.frames % self.interval == 0:
+            self.checksums.append(state_checksum(level))
@@ -0,0 +1,15 @@
+# SpaceStoneDodger: Batched collision checking
+# Tests a whole set of circles against one sprite in a single vectorized pass, with the same
+# math as pygame.sprite.collide_circle but without its per-call overhead. Used by the NumPy
+# field backend, list fields keep collide_circle
+
+
+
+def circle_hits(centers_x, centers_y, radii, target) -> list:
+    """ Returns the indices of the circles overlapping target (a sprite with rect and radius)
+        Centers and radii are NumPy arrays """
+    target_x, target_y = target.rect.center
+    dist_x = centers_x - target_x
+    dist_y = centers_y - target_y
+    overlapping = dist_x * dist_x + dist_y * dist_y <= (radii + target.radius) ** 2
+    return overlapping.nonzero()[0].tolist()
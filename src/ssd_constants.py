@@ -1,10 +1,22 @@
 # pylint: disable=no-member
 
 # SpaceStoneDodger: Constants database
-import pygame, os, json
+import pygame, os
+import time as t
+from collections import OrderedDict
+from io import BytesIO
+import ssd_preloader as pre
+import ssd_language_store as lng
 
 
-pygame.mixer.init()
+# Headless mode uses SDL's dummy drivers, it MUST be decided before any pygame init
+HEADLESS = os.environ.get("SSD_HEADLESS", "0") == "1"
+if HEADLESS:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Importing this module has no other side effect: display, mixer and assets are
+# all set up on first use (see get_display() and AssetManager)
 
 
 # HELPER FUNCTIONS
@@ -40,8 +52,26 @@ def load_audio_music(audio_asset_folder: str, filename: str) -> None:
         raise SystemExit(message)
 
 
+def get_display() -> pygame.Surface:
+    """ Returns the game window, opening it the first time """
+    display = pygame.display.get_surface()
+    if display is None:
+        display = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        AssetManager.on_display_created()
+    return display
+
+
+def ensure_mixer() -> None:
+    """ Initializes the audio mixer if nobody did yet """
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+
 def pressed(direction: str, pressed_key: list) -> bool:
-    """ Returns if one of the corresponding key of a direction is been pressed """
+    """ Returns if one of the corresponding key of a direction is been pressed
+        pressed_key can be an ssd_input.InputState, where bindings are already resolved """
+    if hasattr(pressed_key, "is_pressed"):
+        return pressed_key.is_pressed(direction)
     return any( (pressed_key[binding] for binding in KEYBINDINGS[direction]) )
 
 
@@ -55,21 +85,31 @@ def set_text_db(chosen_language: dict) -> None:
     TextDB.set_text_db(chosen_language)
 
 
+def cycle_language() -> None:
+    """ Sets the next language as current """
+    TextDB.use_language(open_language_store().next_code())
+
+
+def open_language_store() -> type:
+    """ Returns the language store, reading (or compiling) its index the first time """
+    lng.LanguageStore.open(TRANSLATIONS_FOLDER, LANGUAGE_CACHE_FILE)
+    return lng.LanguageStore
+
+
 def get_every_languages() -> list():
     """ Returns a list with every language dictionaries """
-    filelist = [langfile for langfile in os.listdir(TRANSLATIONS_FOLDER)
-                if langfile.endswith(".json")]
+    store = open_language_store()
+    return [store.get_pack(code) for code in store.codes]
 
-    langlist = []
-    for langfile in filelist:
-        fullpath = os.path.join(TRANSLATIONS_FOLDER, langfile)
-        with open(fullpath, "r") as myfile:
-            this_lang = json.load(myfile)
-            # Every file NEEDS to have LANGUAGE key
-            if this_lang.get("LANGUAGE", None):
-                langlist.append(this_lang)
 
-    return langlist
+def preload_languages() -> None:
+    """ Reads (or compiles) the language store index on the preloader thread """
+    pre.Preloader.preload(("languages", TRANSLATIONS_FOLDER), open_language_store)
+
+
+def get_font(font_file: str, size: int) -> pygame.font.Font:
+    """ Returns the shared font for a file and size, loading it only the first time """
+    return FontRegistry.get_font(font_file, size)
 
 
 def set_music_volume(new_volume: float) -> None:
@@ -99,14 +139,24 @@ def get_sfx_volume() -> float:
 
 # Game Parameters
 FPS = 60
+FRAME_CAPPED = not HEADLESS # Headless runs go as fast as the CPU allows
+PROFILING = os.environ.get("SSD_PROFILE", "0") == "1" # Per-frame timings, see ssd_frame_profiler
+PROFILE_DUMP_FILE = os.environ.get("SSD_PROFILE_DUMP", "frame_timings.csv")
+RUN_SEED = int(os.environ["SSD_SEED"]) if os.environ.get("SSD_SEED") else None # Fixed seed for reproducible runs
+REPLAY_DIR = os.environ.get("SSD_REPLAY_DIR") # If set, every level played is saved there as a replay
+CHECKSUM_INTERVAL = int(os.environ.get("SSD_CHECKSUM_EVERY", "0")) # Frames between level state checksums, 0 is off
+FIELD_BACKEND = os.environ.get("SSD_FIELD_BACKEND", "list") # "numpy" for the vectorized asteroid field
 SCREEN_WIDTH, SCREEN_HEIGHT = 900, 500
-MAIN_DISPLAY = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 
 STARS_SPEED = 2
 STAR_SPRITE_RADIUS = 1
+STARFIELD_LAYERS = 1 # Parallax layers of the pre-rendered starfield, 1 looks like the classic one
 
 ASTEROID_STARTING_MIN_SPEED = 3
 ASTEROID_STARTING_MAX_SPEED = 8
+ASTEROID_MIN_SCALE = 24 # in PIXELS
+ASTEROID_MAX_SCALE = 128 # in PIXELS
+ASTEROID_SCALE_QUANTUM = 1 # Asteroid sizes are rounded to multiples of this, to share more sprites
 
 BOOST_SPEED_MODIFIER = 2
 
@@ -119,6 +169,12 @@ POWER_UP_SPEED = 3
 
 AUDIO_SFX_VOLUME = 0.2
 AUDIO_MUSIC_VOLUME = 0.2
+SFX_CHANNEL_BUDGETS = { # Sound categories as keys, (mixer channels, minimum SECONDS between two plays) as values
+    "text": (1, 0.02), # Well below a letter at speed 20 (3 frames, 0.05s), frame jitter mustn't drop ticks
+    "player": (2, 0.0),
+    "pickup": (2, 0.06),
+    "ui": (1, 0.0),
+}
 
 
 
@@ -144,6 +200,15 @@ KEYBINDINGS = {
         pygame.K_SPACE,
     ),
 }
+# Gamepad bindings: ("button", button) or ("axis", axis, direction) or ("hat", hat, (x, y))
+GAMEPAD_BINDINGS = {
+    "UP": (("axis", 1, -1), ("hat", 0, (0, 1))),
+    "DOWN": (("axis", 1, 1), ("hat", 0, (0, -1))),
+    "LEFT": (("axis", 0, -1), ("hat", 0, (-1, 0))),
+    "RIGHT": (("axis", 0, 1), ("hat", 0, (1, 0))),
+    "SPACE": (("button", 0),),
+}
+GAMEPAD_DEADZONE = 0.5 # Axis values closer than this to the center are ignored
 
 
 # Assets Constants
@@ -152,15 +217,19 @@ AUDIO_ASSET_DIR = "Audio"
 AUDIO_SFX_DIR = os.path.join(ASSET_DIR, AUDIO_ASSET_DIR, "SFX")
 AUDIO_MUSIC_DIR = os.path.join(ASSET_DIR, AUDIO_ASSET_DIR, "MUSIC")
 TRANSLATIONS_FOLDER = "lang"
-SHIP_SPRITE = load_image(ASSET_DIR, "Ship.png").convert_alpha()
-ASTEROID_SPRITE = load_image(ASSET_DIR, "asteroid.png").convert_alpha()
-SPACE_BG = load_image(ASSET_DIR, "purple_space_bg.png").convert() # by Digital Moons (https://digitalmoons.itch.io/)
-METAL_SCRAP_SPRITE = load_image(ASSET_DIR, "metal_scrap2.png").convert_alpha()
+LANGUAGE_CACHE_FILE = os.path.join(TRANSLATIONS_FOLDER, "languages.cache") # Compiled by LanguageStore
 TITLE_FONT = os.path.join(ASSET_DIR, "kongtext.ttf") # Font by codeman38 | cody@zone38.net | http://www.zone38.net/
-SFX_POWERUP_COLLECTED = load_audio_sfx(AUDIO_SFX_DIR, "sci-fi-positive-notification.ogg")
-SFX_ASTEROID_IMPACT = load_audio_sfx(AUDIO_SFX_DIR, "impactPlate_heavy_004.ogg")
-SFX_PLAYER_DEATH = load_audio_sfx(AUDIO_SFX_DIR, "explosionCrunch_000.ogg")
-SFX_TEXT_TICK = load_audio_sfx(AUDIO_SFX_DIR, "beep.ogg")
+# Images and sounds below are loaded by AssetManager the first time someone reads them
+LAZY_ASSETS = {
+    "SHIP_SPRITE": ("image", "Ship.png", True),
+    "ASTEROID_SPRITE": ("image", "asteroid.png", True),
+    "SPACE_BG": ("image", "purple_space_bg.png", False), # by Digital Moons (https://digitalmoons.itch.io/)
+    "METAL_SCRAP_SPRITE": ("image", "metal_scrap2.png", True),
+    "SFX_POWERUP_COLLECTED": ("sound", "sci-fi-positive-notification.ogg"),
+    "SFX_ASTEROID_IMPACT": ("sound", "impactPlate_heavy_004.ogg"),
+    "SFX_PLAYER_DEATH": ("sound", "explosionCrunch_000.ogg"),
+    "SFX_TEXT_TICK": ("sound", "beep.ogg"),
+}
 MUSIC_MENU = "joystock-neon-lights.ogg"
 MUSIC_LOSINGSCREEN = "Power Bots Loop.ogg"
 MUSIC_GAMELEVEL = "background-loop-melodic-techno-04-3822.ogg"
@@ -204,23 +273,38 @@ class TXT:
 
 class TextDB:
     """ Inner class to manage languages and text """
-    current_text_db = { "LANGUAGE": "no_language_loaded"}
+    current_text_db = None # Loaded on first use
     placeholder_text = "???" # To be displayed if the language selected doesn't have a key
 
-    # Setting English as default language (if present)
-    for lang in get_every_languages():
-        if lang["LANGUAGE"].lower() == "english":
-            current_text_db = lang
+    @classmethod
+    def load_default_language(cls) -> None:
+        """ Sets English as default language (if present) """
+        cls.current_text_db = { "LANGUAGE": "no_language_loaded"}
+        store = open_language_store()
+        code = store.code_for_name("english")
+        if code is not None:
+            cls.use_language(code)
+
+    @classmethod
+    def use_language(cls, code: str) -> None:
+        """ Sets a language of the store as the current one, listeners are told after the switch """
+        cls.current_text_db = lng.LanguageStore.get_pack(code)
+        lng.LanguageStore.set_current(code)
 
     @classmethod
     def get_text(cls, text_db_id: str) -> str:
         """ Returns a string from the database based on provided id """
+        if cls.current_text_db is None:
+            cls.load_default_language()
         return cls.current_text_db.get(text_db_id, cls.placeholder_text)
 
     @classmethod
     def set_text_db(cls, chosen_language: dict) -> None:
         """ Sets a language dict as the current one """
         cls.current_text_db = chosen_language
+        code = lng.LanguageStore.code_for_name(chosen_language.get("LANGUAGE", ""))
+        if code is not None:
+            lng.LanguageStore.set_current(code)
 
 
 class AudioSettings:
@@ -247,33 +331,168 @@ class AudioSettings:
         cls.music_volume = new_volume
 
 
+class AssetManager:
+    """ Lazy loading of images and sounds (fonts are shared by FontRegistry)
+        Every asset is loaded once on first use and kept for the whole game, like the sprites classes cache """
+
+    assets = {} # (kind, filename) as keys, loaded assets as values
+    load_times = {} # (kind, filename) as keys, SECONDS spent loading as values
+    alpha_images = {} # (kind, filename) as keys, if the image has per-pixel alpha as values
+    unconverted = set() # Images loaded before the display existed
+
+    @classmethod
+    def _load_once(cls, key: tuple, loader) -> object:
+        """ Returns an asset, loading it the first time """
+        if key not in cls.assets:
+            start = t.perf_counter()
+            cls.assets[key] = loader()
+            cls.load_times[key] = t.perf_counter() - start
+        return cls.assets[key]
+
+    @classmethod
+    def _convert(cls, image: pygame.Surface, alpha: bool) -> pygame.Surface:
+        """ Converts an image to the display pixel format """
+        return image.convert_alpha() if alpha else image.convert()
+
+    @classmethod
+    def _load_image(cls, key: tuple, filename: str, alpha: bool) -> pygame.Surface:
+        image = pre.Preloader.take(key, wait=True) # Already decoded if preloaded
+        if image is None:
+            image = load_image(ASSET_DIR, filename)
+        cls.alpha_images[key] = alpha
+        if pygame.display.get_surface() is None: # convert() needs a display, it'll be done later
+            cls.unconverted.add(key)
+            return image
+        return cls._convert(image, alpha)
+
+    @classmethod
+    def get_image(cls, filename: str, alpha: bool = True) -> pygame.Surface:
+        """ Returns an image from the assets folder, converted for fast blitting """
+        key = ("image", filename)
+        return cls._load_once(key, lambda: cls._load_image(key, filename, alpha))
+
+    @classmethod
+    def preload_image(cls, filename: str) -> None:
+        """ Decodes an image on the preloader thread, get_image() will only have to convert it """
+        key = ("image", filename)
+        if key not in cls.assets:
+            pre.Preloader.preload(key, lambda: pygame.image.load(os.path.join(ASSET_DIR, filename)))
+
+    @classmethod
+    def get_sound(cls, filename: str) -> pygame.mixer.Sound:
+        """ Returns a sound effect from the sfx folder """
+        ensure_mixer()
+        return cls._load_once(("sound", filename), lambda: load_audio_sfx(AUDIO_SFX_DIR, filename))
+
+    @classmethod
+    def on_display_created(cls) -> None:
+        """ Converts the images loaded before the display was there """
+        for key in cls.unconverted:
+            cls.assets[key] = cls._convert(cls.assets[key], cls.alpha_images[key])
+        cls.unconverted.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """ Returns the load time (SECONDS) of every asset ever loaded """
+        return {key: {"load_time": load_time} for key, load_time in cls.load_times.items()}
+
+
+class FontRegistry:
+    """ Process-wide cache of fonts: each (file, size) pair is parsed once and shared """
+
+    fonts = OrderedDict() # (file, size) as keys, pygame fonts as values, least recently used first
+    max_fonts = 32 # Objects still using an evicted font keep working, it's just not shared anymore
+    stats = {"loads": 0, "hits": 0, "evictions": 0, "load_time": 0.0}
+
+    @classmethod
+    def get_font(cls, font_file: str, size: int) -> pygame.font.Font:
+        """ Returns the font for (font_file, size), loading it if needed """
+        key = (font_file, int(size))
+        font = cls.fonts.get(key)
+        if font is not None:
+            cls.stats["hits"] += 1
+            cls.fonts.move_to_end(key)
+            return font
+
+        if not pygame.font.get_init():
+            pygame.font.init()
+        start = t.perf_counter()
+        font = pygame.font.Font(font_file, int(size))
+        cls.stats["load_time"] += t.perf_counter() - start
+        cls.stats["loads"] += 1
+        cls.fonts[key] = font
+        if len(cls.fonts) > cls.max_fonts:
+            cls.fonts.popitem(last=False)
+            cls.stats["evictions"] += 1
+        return font
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """ Returns load/hit/eviction counters, load_time is in SECONDS """
+        return dict(cls.stats, cached_fonts=len(cls.fonts))
+
+
 class Jukebox:
     """ Interface to manage pygame.mixer.music singleton """
 
     current_song = None
-    pygame.mixer.music.set_volume(AudioSettings.get_volumes()[1])
+    enabled = not HEADLESS # No music in headless runs
+    song_data = {} # Song file names as keys, the whole file read by the preloader as values
+
+    @classmethod
+    def preload(cls, songfile: str, songs_folder: str = AUDIO_MUSIC_DIR) -> None:
+        """ Reads a song file on the preloader thread, so that playsong() won't touch the disk """
+        if not cls.enabled or songfile in cls.song_data:
+            return
+        def read_song():
+            with open(os.path.join(songs_folder, songfile), "rb") as song:
+                return song.read()
+        pre.Preloader.preload(("music", songfile), read_song)
 
     @classmethod
     def playsong(cls, songfile: str, howmanytimes: int = -1, songs_folder: str = AUDIO_MUSIC_DIR) -> None:
         """ Starts the selected song if it's different from the current one """
+        if not cls.enabled:
+            return
+        ensure_mixer()
         if pygame.mixer.music.get_busy() and songfile == cls.current_song:
             return # Let the song play
         
         cls.current_song = songfile
         pygame.mixer.music.stop()
         pygame.mixer.music.unload()
-        pygame.mixer.music.load(os.path.join(songs_folder, songfile))
+        data = cls.song_data.get(songfile) or pre.Preloader.take(("music", songfile), wait=True)
+        if data:
+            cls.song_data[songfile] = data # Songs are played again and again, keeping them
+            pygame.mixer.music.load(BytesIO(data), os.path.splitext(songfile)[1][1:])
+        else:
+            pygame.mixer.music.load(os.path.join(songs_folder, songfile))
+        pygame.mixer.music.set_volume(AudioSettings.get_volumes()[1])
         pygame.mixer.music.play(loops=howmanytimes)
 
     @classmethod
     def stopmusic(cls) -> None:
         """ Stops the curret playing music """
-        pygame.mixer.music.stop()
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
     
     @classmethod
     def update_volume(cls) -> None:
         """ Gets the music volume setting and sets it as current """
-        pygame.mixer.music.set_volume(AudioSettings.get_volumes()[1])
+        if pygame.mixer.get_init():
+            pygame.mixer.music.set_volume(AudioSettings.get_volumes()[1])
+
+
+def __getattr__(name: str):
+    """ Lazy module attributes: the window and the assets listed in LAZY_ASSETS """
+    if name == "MAIN_DISPLAY":
+        return get_display()
+    if name in LAZY_ASSETS:
+        kind, filename, *alpha = LAZY_ASSETS[name]
+        if kind == "image":
+            return AssetManager.get_image(filename, *alpha)
+        return AssetManager.get_sound(filename)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Testing
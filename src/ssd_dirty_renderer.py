@@ -0,0 +1,85 @@
+# pylint: disable=no-member
+
+# SpaceStoneDodger: Dirty Rectangles Renderer
+# Scenes draw on an off-screen canvas that remembers what was touched each frame,
+# only those areas get their background restored and pushed to the display
+
+import pygame
+
+
+
+class TrackedSurface(pygame.Surface):
+    """ Canvas that records the rect of every blit and fill done on it during a frame """
+
+    def __init__(self, size: tuple) -> None:
+        super().__init__(size)
+        self.dirty_rects = [] # Drawn during this frame
+        self.previous_rects = [self.get_rect()] # Drawn during the last frame, the first frame is full
+
+
+    def blit(self, source, dest, area=None, special_flags=0) -> pygame.Rect:
+        rect = super().blit(source, dest, area, special_flags)
+        self.dirty_rects.append(rect)
+        return rect
+
+
+    def blits(self, blit_sequence, doreturn=1):
+        rects = super().blits(blit_sequence, True)
+        self.dirty_rects.extend(rects)
+        return rects if doreturn else None
+
+
+    def fill(self, color, rect=None, special_flags=0) -> pygame.Rect:
+        rect = super().fill(color, rect, special_flags)
+        self.dirty_rects.append(rect)
+        return rect
+
+
+    def mark_dirty(self, rect: pygame.Rect) -> None:
+        """ For drawing done outside blit/fill, e.g. pygame.draw functions """
+        self.dirty_rects.append(rect)
+
+
+    def restore_background(self, background: pygame.Surface) -> None:
+        """ Blits the background back only where something was drawn last frame """
+        for rect in self.previous_rects:
+            super().blit(background, rect, rect)
+
+
+
+class DirtyRectRenderer:
+    """ Pushes only the dirty areas of a TrackedSurface to the display """
+
+    def __init__(self, display: pygame.Surface, full_update_ratio: float = 0.5) -> None:
+        """ When dirty areas cover more than full_update_ratio of the screen, a full update is cheaper """
+        self.display = display
+        self.canvas = TrackedSurface(display.get_size())
+        self.full_update_area = full_update_ratio * display.get_width() * display.get_height()
+        self.full_updates = 0
+        self.partial_updates = 0
+
+
+    def invalidate(self) -> None:
+        """ Forces the next frame to be fully redrawn, e.g. when a scene starts again """
+        self.canvas.previous_rects = [self.canvas.get_rect()]
+
+
+    def present(self) -> None:
+        """ Sends this frame to the display, then gets the canvas ready for the next one """
+        canvas = self.canvas
+        # Last frame's areas must be pushed too: they show the background again now
+        rects = canvas.previous_rects + canvas.dirty_rects
+        dirty_area = sum(rect.width * rect.height for rect in rects) # Overlaps count twice, good enough
+
+        if dirty_area >= self.full_update_area:
+            self.display.blit(canvas, (0, 0))
+            pygame.display.update()
+            self.full_updates += 1
+        else:
+            for rect in rects:
+                self.display.blit(canvas, rect, rect)
+            pygame.display.update(rects)
+            self.partial_updates += 1
+
+        canvas.previous_rects = canvas.dirty_rects
+        canvas.dirty_rects = []
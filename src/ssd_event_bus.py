@@ -0,0 +1,72 @@
+# SpaceStoneDodger: Event Bus
+# In-process events for the game logic: delivered straight to subscribers once per
+# frame instead of going through the SDL event queue, with optional per-frame coalescing
+
+import pygame
+from collections import namedtuple, Counter
+
+
+
+# What happened (type), to which element (source) and where
+BusEvent = namedtuple("BusEvent", ["type", "source", "x", "y"], defaults=(None, None, None))
+
+
+def post(bus, event_type: int, coalesce: bool = False, **payload) -> None:
+    """ Posts on bus, or in the pygame event queue for objects that aren't attached to one """
+    if bus is not None:
+        bus.post(event_type, coalesce, **payload)
+    else:
+        pygame.event.post(pygame.event.Event(event_type, payload))
+
+
+
+class EventBus:
+    """ Collects the events of a frame and hands them to subscribers on dispatch() """
+
+    def __init__(self) -> None:
+        self.subscribers = {} # Event types as keys, lists of callables as values
+        self.pending = [] # BusEvents waiting for dispatch(), in posting order
+        self.coalesced = {} # Event types as keys, the BusEvent standing for the whole frame as values
+        self.frame_counts = Counter() # Event types as keys, posts counted since the last dispatch()
+        self.last_frame_counts = Counter()
+        self.stats = {"posted": 0, "delivered": 0, "coalesced": 0, "peak_per_frame": 0}
+
+
+    def subscribe(self, event_type: int, callback) -> None:
+        """ callback(bus_event) will be called for every event of this type """
+        self.subscribers.setdefault(event_type, []).append(callback)
+
+
+    def post(self, event_type: int, coalesce: bool = False, **payload) -> None:
+        """ Queues an event for the next dispatch()
+            coalesce: every event of this type in the same frame is merged into the first one """
+        self.frame_counts[event_type] += 1
+        self.stats["posted"] += 1
+        if coalesce:
+            if event_type in self.coalesced:
+                self.stats["coalesced"] += 1
+                return
+            self.coalesced[event_type] = True
+        self.pending.append(BusEvent(event_type, **payload))
+
+
+    def dispatch(self) -> None:
+        """ Delivers the events posted since the last call, events posted by subscribers wait for the next one """
+        events, self.pending = self.pending, []
+        self.coalesced = {}
+        self.last_frame_counts, self.frame_counts = self.frame_counts, Counter()
+        self.stats["peak_per_frame"] = max(self.stats["peak_per_frame"], sum(self.last_frame_counts.values()))
+        for event in events:
+            for callback in self.subscribers.get(event.type, ()):
+                callback(event)
+                self.stats["delivered"] += 1
+
+
+    def get_frame_counts(self) -> dict:
+        """ Returns how many events of each type were posted in the last dispatched frame """
+        return dict(self.last_frame_counts)
+
+
+    def get_stats(self) -> dict:
+        """ Returns posted/delivered/coalesced totals and the most events seen in one frame """
+        return dict(self.stats)
@@ -3,20 +3,66 @@
 # SpaceStoneDodger: Field Class, from which every type of field should inherit
 
 import pygame
-from random import randint
 import ssd_constants as CST
+import ssd_rng as rng
+
+
+
+class ElementPool:
+    """ Dormant field elements waiting to be reused, one pool per element class """
+
+    pools = {} # Element classes as keys, their pool as values
+    MAX_DORMANT = 256 # Elements beyond this are left to the garbage collector
+
+    @classmethod
+    def for_class(cls, element_class) -> "ElementPool":
+        """ Returns the pool shared by every field of element_class """
+        if element_class not in cls.pools:
+            cls.pools[element_class] = ElementPool(element_class)
+        return cls.pools[element_class]
+
+
+    def __init__(self, element_class) -> None:
+        self.element_class = element_class
+        self.dormant = []
+        self.created = 0
+        self.reused = 0
+
+
+    def acquire(self, x: int, y: int, speed: int):
+        """ Returns a dormant element moved to x, y or a brand new one if none is left """
+        if self.dormant:
+            self.reused += 1
+            element = self.dormant.pop()
+            element.relocate(x, y, speed)
+            return element
+        self.created += 1
+        return self.element_class(x, y, speed)
+
+
+    def release(self, element) -> None:
+        """ Puts an element to sleep until someone needs it again """
+        if len(self.dormant) < ElementPool.MAX_DORMANT:
+            self.dormant.append(element)
 
 
 
 # New generic Field class
 class Field_of:
-    def __init__(self, of_what, howmany: int, spawn_parameters: dict) -> None:
+    def __init__(self, of_what, howmany: int, spawn_parameters: dict, stream_name: str = None) -> None:
+        """ stream_name: name of this field's random stream, owner and role like "GameLevel.asteroids" """
         self.base_element_class = of_what
+        self.pool = ElementPool.for_class(of_what)
+        # Elements that can move() and hand out their blit_data() are drawn with a single blits() call
+        self.batched_drawing = hasattr(of_what, "move") and hasattr(of_what, "blit_data")
         self.spawn_parameters = spawn_parameters
+        self.rng = rng.RandomService.new_stream(stream_name or of_what.__name__) # Same seed, same spawns
         self.to_be_deleted = 0
         self.elements = [self.new_element() for _ in range(howmany)]
         self.how_many_passed = 0
         self.stop_all = False
+        self.spatial_hash = None
+        self.event_bus = None # Set by the scene, without it events go through pygame's queue
 
 
     def stop_movements(self) -> None:
@@ -24,18 +70,52 @@ class Field_of:
         self.stop_all = True
 
 
+    def attach_spatial_hash(self, spatial_hash) -> None:
+        """ Registers every element into a ssd_spatial_hash.SpatialHash, this field is their layer
+            Elements need rect and radius, as collisions do. Opt-in: keeping the grid updated costs
+            more than it saves on a single player query, it pays off for element versus element checks """
+        self.spatial_hash = spatial_hash
+        for element in self.elements:
+            self._update_spatial_hash(element)
+
+
+    def _update_spatial_hash(self, element) -> None:
+        """ Keeps an element's grid cells up to date """
+        self.spatial_hash.update(element, element.rect.centerx, element.rect.centery, element.radius, self)
+
+
     def random_position(self, spwn_par: dict) -> int:
         """ returns a tuple of random x,y inside the spawn zone and speed """
-        newx = randint(spwn_par.get("x_from", 0), spwn_par.get("x_to", 0))
-        newy = randint(spwn_par.get("y_from", 0), spwn_par.get("y_to", 0))
-        newspeed = randint(spwn_par.get("min_speed", 0), spwn_par.get("max_speed", 0))
+        newx, newy, newspeed = self.rng.randint_each((
+            (spwn_par.get("x_from", 0), spwn_par.get("x_to", 0)),
+            (spwn_par.get("y_from", 0), spwn_par.get("y_to", 0)),
+            (spwn_par.get("min_speed", 0), spwn_par.get("max_speed", 0)),
+        ))
         return newx, newy, newspeed
 
 
     def new_element(self):
         """ returns a new asteroid at a random point of the spawn location """
         newx, newy, newspeed = self.random_position(self.spawn_parameters)
-        return self.base_element_class(newx, newy, newspeed)
+        return self.pool.acquire(newx, newy, newspeed)
+
+
+    def _swap_remove(self, index: int) -> None:
+        """ Removes an element in O(1): the last element takes its place """
+        element = self.elements[index]
+        last_element = self.elements.pop()
+        if index < len(self.elements):
+            self.elements[index] = last_element
+        if self.spatial_hash is not None:
+            self.spatial_hash.remove(element)
+        self.pool.release(element)
+
+
+    def release_all(self) -> None:
+        """ Gives every element back to the pool, the field is empty afterwards """
+        while self.elements:
+            self._swap_remove(len(self.elements) - 1)
+        self.to_be_deleted = 0
 
 
     def resize(self, newsize: int) -> None:
@@ -50,12 +130,35 @@ class Field_of:
         pass
 
 
+    def other_stuff_for_all(self) -> None:
+        """ Other functions to call once per frame on the whole field, after every element is updated """
+        pass
+
+
+    def colliding_with(self, target) -> list:
+        """ Returns the indices of the elements overlapping target
+            Plain collide_circle per element: only the NumPy backend is batched """
+        if self.spatial_hash is None:
+            return [index for index, element in enumerate(self.elements)
+                    if pygame.sprite.collide_circle(element, target)]
+        target_x, target_y = target.rect.center # Broad phase: only elements near the target
+        nearby = self.spatial_hash.query_circle(target_x, target_y, target.radius, self)
+        return [index for index, element in enumerate(self.elements)
+                if element in nearby and pygame.sprite.collide_circle(element, target)]
+
+
+    def get_state(self) -> list:
+        """ (x, y, speed) of every element in a fixed order, for simulation checksums """
+        return sorted((element.x, element.y, element.speed) for element in self.elements)
+
+
     def get_how_many_passed(self) -> int:
         return self.how_many_passed
 
 
     def game_tick_update(self, window: pygame.Surface) -> None:
         """ Updates each field element """
+        blit_list = []
         i = 0
         while i < len(self.elements): 
             element = self.elements[i]
@@ -63,16 +166,26 @@ class Field_of:
             if element.is_offscreen_left():
                 self.how_many_passed += 1 # Keeping track of how many elements have passed
                 if self.to_be_deleted > 0: # we ditch this element if there are too many...
-                    self.elements.pop(i)
+                    self._swap_remove(i) # The element now at i hasn't been updated yet
                     self.to_be_deleted -= 1
                     continue
                 else:
                     newx, newy, newspeed = self.random_position(self.spawn_parameters)
                     element.relocate(newx, newy, newspeed)
 
-            element.game_tick_update(window)
+            if self.batched_drawing:
+                element.move()
+                blit_list.append(element.blit_data())
+            else:
+                element.game_tick_update(window)
+            if self.spatial_hash is not None:
+                self._update_spatial_hash(element)
             self.other_stuff_for_each(element)
 
             i += 1
 
+        if blit_list:
+            window.blits(blit_list, False) # Same order as single blits, without their overhead
+        self.other_stuff_for_all()
+
 
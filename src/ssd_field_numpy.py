@@ -0,0 +1,181 @@
+# pylint: disable=no-member
+
+# SpaceStoneDodger: NumPy Field Class, a structure-of-arrays alternative to ssd_field.Field_of
+# Every element attribute lives in its own contiguous array, so moving, recycling
+# and culling the whole field are a handful of vectorized operations per frame
+
+from abc import ABC, abstractmethod
+import pygame
+import ssd_rng as rng
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, only this backend needs it
+    np = None
+
+
+
+class ArrayField_of(ABC):
+    """ Same behaviour as Field_of, but elements are rows of NumPy arrays instead of objects
+        Subclasses must at least tell which surface an element of a given scale is drawn with """
+
+    def __init__(self, howmany: int, spawn_parameters: dict, stream_name: str = None) -> None:
+        if np is None:
+            raise ImportError("ArrayField_of needs NumPy, install it or use ssd_field.Field_of")
+        self.spawn_parameters = spawn_parameters
+        # Same RandomStream draws as Field_of, so both backends can be checksummed against each other
+        self.rng = rng.RandomService.new_stream(stream_name or type(self).__name__)
+        self.x = np.empty(0, dtype=np.float64)
+        self.y = np.empty(0, dtype=np.float64)
+        self.speed = np.empty(0, dtype=np.float64)
+        self.scale = np.empty(0, dtype=np.int64)
+        self.radius = np.empty(0, dtype=np.int64)
+        self.surfaces = [] # Only changes with the field size, so it's kept as a plain list
+        self.to_be_deleted = 0
+        self.how_many_passed = 0
+        self.stop_all = False
+        self.speed_modifier = 1
+        self.event_bus = None # Set by the scene, without it events go through pygame's queue
+        self.resize(howmany)
+
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+    def stop_movements(self) -> None:
+        """ Used as flag to stop the movements of field elements """
+        self.stop_all = True
+
+
+    def spawn_ranges(self) -> tuple:
+        """ (low, high) ranges of x, y and speed, in Field_of.random_position() order """
+        spwn_par = self.spawn_parameters
+        return ((spwn_par.get("x_from", 0), spwn_par.get("x_to", 0)),
+                (spwn_par.get("y_from", 0), spwn_par.get("y_to", 0)),
+                (spwn_par.get("min_speed", 0), spwn_par.get("max_speed", 0)))
+
+
+    def random_positions(self, howmany: int) -> tuple:
+        """ Returns three arrays of random x, y inside the spawn zone and speeds """
+        rows = np.array(self.rng.randint_table(self.spawn_ranges(), howmany), dtype=np.float64).reshape(howmany, 3)
+        return rows[:, 0], rows[:, 1], rows[:, 2]
+
+
+    def scale_range(self) -> tuple:
+        """ To be overridden: (low, high) of the random size new elements get, None if they have none """
+        return None
+
+
+    def new_scales(self, drawn):
+        """ To be overridden: turns the sizes drawn from scale_range() into sprite sizes """
+        return drawn.astype(np.int64)
+
+
+    def radius_for(self, scales):
+        """ To be overridden: returns the collision radius for an array of scales """
+        return scales // 2
+
+
+    @abstractmethod
+    def element_surface(self, scale: int) -> pygame.Surface:
+        """ Returns the surface to draw for an element of this scale """
+
+
+    def resize(self, newsize: int) -> None:
+        """ Resizes the number of elements on the screen """
+        self.to_be_deleted = max(0, len(self) - newsize) # Shrinking happens offscreen, like Field_of
+        howmany = newsize - len(self)
+        if howmany <= 0:
+            return
+        # Each new element draws x, y, speed then its size, as Field_of.new_element() does
+        ranges = self.spawn_ranges()
+        scale_range = self.scale_range()
+        if scale_range is not None:
+            ranges += (scale_range,)
+        rows = np.array(self.rng.randint_table(ranges, howmany), dtype=np.float64).reshape(howmany, len(ranges))
+        newx, newy, newspeed = rows[:, 0], rows[:, 1], rows[:, 2]
+        if scale_range is not None:
+            newscale = self.new_scales(rows[:, 3])
+        else:
+            newscale = np.zeros(howmany, dtype=np.int64)
+        self.x = np.concatenate((self.x, newx))
+        self.y = np.concatenate((self.y, newy))
+        self.speed = np.concatenate((self.speed, newspeed))
+        self.scale = np.concatenate((self.scale, newscale))
+        self.radius = np.concatenate((self.radius, self.radius_for(newscale)))
+        self.surfaces.extend(self.element_surface(scale) for scale in newscale.tolist())
+
+
+    def release_all(self) -> None:
+        """ Empties the field, same interface as Field_of (arrays have nothing to pool) """
+        self.to_be_deleted = 0
+        self.x, self.y, self.speed = self.x[:0], self.y[:0], self.speed[:0]
+        self.scale, self.radius = self.scale[:0], self.radius[:0]
+        self.surfaces = []
+
+
+    def get_state(self) -> list:
+        """ (x, y, speed) of every element in the same order as Field_of.get_state() """
+        return sorted(zip(self.x.tolist(), self.y.tolist(), self.speed.tolist()))
+
+
+    def get_how_many_passed(self) -> int:
+        return self.how_many_passed
+
+
+    def _recycle_offscreen(self) -> None:
+        """ Deletes or relocates every element that left the screen on the left """
+        is_offscreen = self.x < -self.scale
+        offscreen = np.flatnonzero(is_offscreen)
+        if len(offscreen) == 0:
+            return
+        self.how_many_passed += len(offscreen)
+
+        if self.to_be_deleted > 0:
+            offscreen = self._swap_remove_offscreen(is_offscreen.tolist())
+
+        if len(offscreen):
+            newx, newy, newspeed = self.random_positions(len(offscreen))
+            self.x[offscreen] = newx
+            self.y[offscreen] = newy
+            self.speed[offscreen] = newspeed
+
+
+    def _swap_remove_offscreen(self, is_offscreen: list):
+        """ Deletes offscreen elements visiting them in Field_of.game_tick_update() order, where
+            the last element takes the place of a deleted one, so the rows keep the same
+            order as Field_of's list and later relocations draw in the same order
+            Returns the indices of the offscreen elements left to relocate """
+        order = list(range(len(self))) # Old row of each new row
+        relocated = []
+        i = 0
+        while i < len(order):
+            if is_offscreen[order[i]]:
+                if self.to_be_deleted > 0:
+                    last_row = order.pop()
+                    if i < len(order):
+                        order[i] = last_row # Visited next, like Field_of._swap_remove()
+                    self.to_be_deleted -= 1
+                    continue
+                relocated.append(i)
+            i += 1
+
+        self.x, self.y, self.speed = self.x[order], self.y[order], self.speed[order]
+        self.scale, self.radius = self.scale[order], self.radius[order]
+        self.surfaces = [self.surfaces[row] for row in order]
+        return np.array(relocated, dtype=np.int64)
+
+
+    def other_stuff_for_all(self) -> None:
+        """ Other functions to call on the whole field each frame, aside from moving and drawing """
+        pass
+
+
+    def game_tick_update(self, window: pygame.Surface) -> None:
+        """ Recycles, moves and draws the whole field """
+        self._recycle_offscreen()
+        self.x -= self.speed * self.speed_modifier
+        window.blits(zip(self.surfaces, zip(self.x.tolist(), self.y.tolist())), False)
+
+        self.other_stuff_for_all()
@@ -0,0 +1,106 @@
+# SpaceStoneDodger: Frame Profiler
+# Optional per-frame timings of everything a Scene does, kept in a ring buffer
+
+import csv
+import time as t
+from collections import deque
+
+
+
+class FrameProfiler:
+    """ Stores the timings (in SECONDS) of the last `capacity` frames, one dict per frame """
+
+    def __init__(self, capacity: int = 600) -> None:
+        self.frames = deque(maxlen=capacity) # Oldest frames fall off automatically
+        self.current_frame = None
+        self.frames_recorded = 0
+
+
+    def start_frame(self, scene_name: str) -> None:
+        """ Opens a new frame record """
+        self.current_frame = {"scene": scene_name, "frame": self.frames_recorded}
+        self.frame_start = t.perf_counter()
+        self.last_mark = self.frame_start
+
+
+    def mark(self, label: str) -> None:
+        """ Records the time since the last mark (or the frame start) under label """
+        now = t.perf_counter()
+        self.record(label, now - self.last_mark)
+        self.last_mark = now
+
+
+    def mark_object(self, position: int, gameobj) -> None:
+        """ Same as mark(), labelled with the object class and its position in the draw order """
+        self.mark(f"{type(gameobj).__name__}#{position}")
+
+
+    def record(self, label: str, seconds: float) -> None:
+        """ Adds a timing to the current frame, same labels are summed up """
+        self.current_frame[label] = self.current_frame.get(label, 0.0) + seconds
+
+
+    def end_frame(self) -> None:
+        """ Closes the current frame record and stores it """
+        self.current_frame["total"] = t.perf_counter() - self.frame_start
+        self.frames.append(self.current_frame)
+        self.frames_recorded += 1
+        self.current_frame = None
+
+
+    def get_frames(self) -> list:
+        """ Returns every frame still in the buffer, oldest first """
+        return list(self.frames)
+
+
+    def get_labels(self) -> list:
+        """ Returns every timing label found in the buffer, in order of appearance """
+        labels = {}
+        for frame in self.frames:
+            labels.update(dict.fromkeys(frame))
+        return [label for label in labels if label not in ("scene", "frame")]
+
+
+    def get_averages(self) -> dict:
+        """ Returns the average time in MILLISECONDS of each label """
+        totals, counts = {}, {}
+        for frame in self.frames:
+            for label, seconds in frame.items():
+                if label not in ("scene", "frame"):
+                    totals[label] = totals.get(label, 0.0) + seconds
+                    counts[label] = counts.get(label, 0) + 1
+        return {label: 1000 * totals[label] / counts[label] for label in totals}
+
+
+    def get_worst_frames(self, howmany: int = 5) -> list:
+        """ Returns the slowest frames in the buffer, slowest first """
+        return sorted(self.frames, key=lambda frame: frame["total"], reverse=True)[:howmany]
+
+
+    def dump(self, filepath: str) -> None:
+        """ Writes the buffer to a CSV file, timings in MILLISECONDS """
+        labels = self.get_labels()
+        with open(filepath, "w", newline="") as myfile:
+            writer = csv.writer(myfile)
+            writer.writerow(["scene", "frame"] + labels)
+            for frame in self.frames:
+                timings = [f"{1000 * frame[label]:.3f}" if label in frame else "" for label in labels]
+                writer.writerow([frame["scene"], frame["frame"]] + timings)
+
+
+
+
+class NullProfiler:
+    """ Same calls as FrameProfiler, doing nothing: what scenes use when profiling is off """
+
+    def start_frame(self, scene_name: str) -> None:
+        pass
+
+    def mark(self, label: str) -> None:
+        pass
+
+    def mark_object(self, position: int, gameobj) -> None:
+        pass
+
+    def end_frame(self) -> None:
+        pass
@@ -0,0 +1,91 @@
+# SpaceStoneDodger: Frame Scheduler
+# Paces the main loop by sleeping until the next frame deadline instead of busy-waiting
+
+import time as t
+from collections import deque
+
+
+
+class FrameScheduler:
+    """ Hybrid frame limiter: a coarse sleep followed by a short spin right before the deadline """
+
+    MIN_SPIN_MARGIN = 0.001 # in SECONDS, never trust sleep() closer than this to a deadline
+    MAX_SPIN_MARGIN = 0.003 # in SECONDS, one very late wake-up mustn't turn the wait into a busy-wait
+    idle_jobs = deque() # (callable, estimated SECONDS) run one at a time in the spare time before a frame, shared by every scheduler
+
+    def __init__(self, fps: int, capped: bool = True) -> None:
+        self.frame_time = 1.0 / fps
+        self.capped = capped
+        # sleep() can overshoot (~1ms on Linux, up to ~15ms on some Windows setups),
+        # this margin adapts to what we actually observe on this machine
+        self.spin_margin = self.MIN_SPIN_MARGIN
+        self.start()
+
+
+    def start(self) -> None:
+        """ Resets deadlines and CPU usage counters, the first frame is due immediately """
+        self.next_deadline = t.perf_counter()
+        self.start_wall_time = self.next_deadline
+        self.start_cpu_time = t.process_time()
+        self.frames = 0
+        self.late_frames = 0
+
+
+    def _sleep(self, seconds: float) -> None:
+        """ Sleeps and learns how much the OS overshoots """
+        before = t.perf_counter()
+        t.sleep(seconds)
+        overshoot = t.perf_counter() - before - seconds
+        # Quick to grow, slow to shrink: one late wake-up shouldn't be repeated
+        self.spin_margin = min(self.MAX_SPIN_MARGIN,
+                               max(self.MIN_SPIN_MARGIN, overshoot * 1.5, self.spin_margin * 0.99))
+
+
+    def wait_next_frame(self) -> None:
+        """ Blocks until the next frame is due """
+        self.frames += 1
+        if not self.capped:
+            return
+
+        remaining = self.next_deadline - t.perf_counter()
+        for queued in FrameScheduler.idle_jobs: # Spare time: do the first chore that fits before the deadline
+            job, cost = queued
+            if cost is None:
+                cost = self.frame_time / 2
+            if cost < remaining - self.spin_margin:
+                FrameScheduler.idle_jobs.remove(queued)
+                job()
+                remaining = self.next_deadline - t.perf_counter()
+                break
+        if remaining > self.spin_margin:
+            self._sleep(remaining - self.spin_margin)
+        while t.perf_counter() < self.next_deadline: # Fine spin for the last bit
+            pass
+
+        now = t.perf_counter()
+        self.next_deadline += self.frame_time
+        if now > self.next_deadline:
+            # We're more than a frame behind: like the old stabilyzer, we drop the backlog
+            self.late_frames += 1
+            self.next_deadline = now + self.frame_time
+
+
+    def get_cpu_usage(self) -> float:
+        """ Returns the percentage of one core used since start() """
+        wall_time = t.perf_counter() - self.start_wall_time
+        if wall_time <= 0:
+            return 0.0
+        return 100 * (t.process_time() - self.start_cpu_time) / wall_time
+
+
+    @classmethod
+    def run_when_idle(cls, job, cost: float = None) -> None:
+        """ Queues a callable to be run when a capped loop has spare time before a frame
+            cost: how many SECONDS the job is expected to take, unknown jobs need half a frame """
+        cls.idle_jobs.append((job, cost))
+
+
+    @classmethod
+    def clear_idle_jobs(cls) -> None:
+        """ Drops every queued job, they were meant for the spare time of another scene """
+        cls.idle_jobs.clear()
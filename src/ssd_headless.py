@@ -0,0 +1,104 @@
+# pylint: disable=no-member
+
+# SpaceStoneDodger: Headless driver
+# Runs scenes with SDL's dummy video and audio drivers and no frame cap,
+# so a whole level takes as long as the CPU needs instead of 295 real seconds
+
+import os, sys
+import time as t
+
+import pygame
+import ssd_constants as CST
+import ssd_scene_gamelevel as SceneLevel
+import ssd_replay as rpl
+import ssd_rng as rng
+import ssd_checksum as cks
+
+
+
+def enable_headless() -> None:
+    """ Switches the game to headless settings, even if ssd_constants was imported before this module
+        SDL drivers are picked when display and mixer are opened, those already open can't be switched """
+    if pygame.display.get_surface() is not None and pygame.display.get_driver() != "dummy":
+        raise RuntimeError(f"The display is already open with the {pygame.display.get_driver()} driver, "
+                           "run headless before opening it (or set SSD_HEADLESS=1)")
+    if pygame.mixer.get_init() and os.environ.get("SDL_AUDIODRIVER") != "dummy":
+        raise RuntimeError("The mixer is already open with a real audio driver, "
+                           "run headless before opening it (or set SSD_HEADLESS=1)")
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    CST.HEADLESS = True
+    CST.FRAME_CAPPED = False
+    CST.Jukebox.enabled = False
+
+
+def run_scene(scene, max_frames: int = 0) -> dict:
+    """ Runs a scene uncapped and returns some stats about the run """
+    enable_headless()
+    scene.frame_capped = False # Scenes built before enable_headless() took the capped setting
+    start = t.perf_counter()
+    next_scene = scene.run(max_frames)
+    elapsed = t.perf_counter() - start
+    return {
+        "next_scene": next_scene,
+        "elapsed": elapsed,
+    }
+
+
+def run_level(god_mode: bool = True, max_frames: int = 0) -> dict:
+    """ Plays a full GameLevel with nobody at the controls """
+    enable_headless()
+    pygame.init()
+    game_level = SceneLevel.GameLevel(CST.get_display())
+    if god_mode: # Nobody is dodging, so the ship would die early otherwise
+        game_level.god_mode(True)
+    seed = game_level.run_seed # The level starts over with a new seed once it's done
+    return dict(run_scene(game_level, max_frames), seed=seed)
+
+
+def run_replay(replay_path: str) -> dict:
+    """ Plays a recorded level back as fast as possible """
+    enable_headless()
+    pygame.init()
+    replay = rpl.Replay.load(replay_path)
+    rng.RandomService.force_next_seed(replay.seed)
+    game_level = SceneLevel.GameLevel(CST.get_display())
+    game_level.play_replay(replay)
+    return dict(run_scene(game_level, replay.frames), seed=replay.seed, frames=replay.frames)
+
+
+def verify_replay(replay_path: str) -> dict:
+    """ Plays a replay back and compares its checksums with the recorded ones
+        first_divergence is the first frame with a different simulation state, None if there's none """
+    replay = rpl.Replay.load(replay_path)
+    if not replay.checksums:
+        raise rpl.ReplayError("Replay recorded without checksums, record it with SSD_CHECKSUM_EVERY set")
+    stats = run_replay(replay_path)
+    checksums = SceneLevel.GameLevel.last_recording.checksums
+    stats["first_divergence"] = cks.first_divergence(replay.checksums, checksums, replay.checksum_interval)
+    return stats
+
+
+
+
+# Usage: python src/ssd_headless.py [how_many_runs]
+# Set SSD_SEED for the same sequence of levels every time
+#        python src/ssd_headless.py replay <file.ssdr>
+#        python src/ssd_headless.py verify <file.ssdr>
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "verify":
+        stats = verify_replay(sys.argv[2])
+        if stats["first_divergence"] is None:
+            print(f"Replay (seed {stats['seed']}): every checksum matches")
+        else:
+            print(f"Replay (seed {stats['seed']}): diverged at frame {stats['first_divergence']}")
+            sys.exit(1)
+        sys.exit()
+    if len(sys.argv) > 2 and sys.argv[1] == "replay":
+        stats = run_replay(sys.argv[2])
+        print(f"Replay (seed {stats['seed']}, {stats['frames']} frames): next scene {stats['next_scene']} in {stats['elapsed']:.2f}s")
+        sys.exit()
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    for run_number in range(runs):
+        stats = run_level()
+        print(f"Run {run_number + 1} (seed {stats['seed']}): next scene {stats['next_scene']} in {stats['elapsed']:.2f}s")
@@ -0,0 +1,107 @@
+# SpaceStoneDodger: Input Layer
+# Keyboard and gamepad bindings are resolved once per frame into a bitmask of
+# actions, every consumer then just tests bits. Masks are plain ints, easy to record
+
+import pygame
+import ssd_constants as CST
+
+
+
+class InputMap:
+    """ Actions (the KEYBINDINGS names) -> keys and gamepad controls, one bit per action """
+
+    shared = None # The map used by every scene, see get_shared()
+
+    def __init__(self, keybindings: dict = None, gamepad_bindings: dict = None) -> None:
+        keybindings = CST.KEYBINDINGS if keybindings is None else keybindings
+        gamepad_bindings = CST.GAMEPAD_BINDINGS if gamepad_bindings is None else gamepad_bindings
+        self.actions = list(keybindings)
+        self.bits = {action: 1 << position for position, action in enumerate(self.actions)}
+        self.keybindings = {action: tuple(keys) for action, keys in keybindings.items()}
+        self.gamepad_bindings = {action: tuple(controls) for action, controls in gamepad_bindings.items()}
+        self.joysticks = []
+        self._flatten_keybindings()
+
+
+    def _flatten_keybindings(self) -> None:
+        """ (key, action bit) pairs, so reading the keyboard is one flat loop """
+        self.key_bits = [(key, self.bits[action]) for action, keys in self.keybindings.items() for key in keys]
+
+
+    @classmethod
+    def get_shared(cls) -> "InputMap":
+        """ Returns the process-wide map, so a rebinding is seen by every scene """
+        if cls.shared is None:
+            cls.shared = cls()
+        return cls.shared
+
+
+    def rebind(self, action: str, keys: tuple = None, gamepad_controls: tuple = None) -> None:
+        """ Replaces the keys and/or the gamepad controls of an existing action """
+        if action not in self.bits:
+            raise KeyError(f"Unknown action: {action}")
+        if keys is not None:
+            self.keybindings[action] = tuple(keys)
+            self._flatten_keybindings()
+        if gamepad_controls is not None:
+            self.gamepad_bindings[action] = tuple(gamepad_controls)
+
+
+    def refresh_joysticks(self) -> None:
+        """ Opens every connected gamepad, called again whenever their number changes """
+        if not pygame.joystick.get_init():
+            pygame.joystick.init()
+        self.joysticks = [pygame.joystick.Joystick(index) for index in range(pygame.joystick.get_count())]
+
+
+    def _gamepad_pressed(self, joystick, control: tuple) -> bool:
+        kind, number = control[0], control[1]
+        if kind == "button":
+            return number < joystick.get_numbuttons() and joystick.get_button(number)
+        if kind == "axis":
+            return number < joystick.get_numaxes() and joystick.get_axis(number) * control[2] > CST.GAMEPAD_DEADZONE
+        if kind == "hat":
+            return number < joystick.get_numhats() and joystick.get_hat(number) == control[2]
+        return False
+
+
+    def read_mask(self, key_state=None) -> int:
+        """ Resolves every binding against the current keyboard (or key_state) and gamepads """
+        if key_state is None:
+            key_state = pygame.key.get_pressed()
+        if pygame.joystick.get_init() and pygame.joystick.get_count() != len(self.joysticks):
+            self.refresh_joysticks()
+        mask = 0
+        for key, bit in self.key_bits:
+            if key_state[key]:
+                mask |= bit
+        for joystick in self.joysticks:
+            for action, controls in self.gamepad_bindings.items():
+                if any(self._gamepad_pressed(joystick, control) for control in controls):
+                    mask |= self.bits[action]
+        return mask
+
+
+    def snapshot(self, key_state=None) -> "InputState":
+        """ Returns this frame's InputState """
+        return InputState(self.read_mask(key_state), self)
+
+
+
+class InputState:
+    """ The actions held in one frame, what scenes pass to keys_to_check() """
+
+    __slots__ = ("mask", "input_map")
+
+    def __init__(self, mask: int, input_map: InputMap) -> None:
+        self.mask = mask
+        self.input_map = input_map
+
+
+    def is_pressed(self, action: str) -> bool:
+        return bool(self.mask & self.input_map.bits[action])
+
+
+    def __repr__(self) -> str:
+        held = [action for action in self.input_map.actions if self.is_pressed(action)]
+        return f"InputState({self.mask:#x}: {', '.join(held) or 'nothing'})"
@@ -0,0 +1,169 @@
+# SpaceStoneDodger: Language Store
+# Every language pack compiled into one indexed cache file: only the small header
+# is read at startup, packs are parsed when a language is actually used.
+# Cache layout: one JSON header line, then the packs one after the other
+#   {"version": 1, "sources": {file: mtime_ns}, "index": {code: [offset, length]}, "names": {code: LANGUAGE}}\n
+#   <pack bytes><pack bytes>...
+
+import os
+import json
+import threading
+import weakref
+
+
+
+class LanguageStore:
+    """ Language codes (the json file names) as keys, packs loaded lazily """
+
+    FORMAT_VERSION = 1
+
+    folder = None
+    cache_file = None
+    index = {} # Codes as keys, [offset, length] in the data section as values
+    names = {} # Codes as keys, LANGUAGE of the pack as values
+    codes = [] # Codes in cycling order
+    positions = {} # Codes as keys, position in codes as values
+    packs = {} # Codes as keys, parsed packs as values
+    data_start = 0 # Where the data section begins in the cache file
+    data = None # Compiled data kept in memory if the cache file couldn't be written
+    current_code = None
+    listeners = [] # Weak references to callables, called with the new code
+    lock = threading.Lock() # open() also runs on the preloader thread
+    stats = {"compiles": 0, "packs_parsed": 0}
+
+    @classmethod
+    def open(cls, folder: str, cache_file: str) -> None:
+        """ Reads the cache index, compiling it again if any source file changed """
+        with cls.lock:
+            if cls.folder == folder and cls.codes:
+                return
+            sources = cls._scan_sources(folder)
+            header = cls._read_header(cache_file)
+            if (header is None or header.get("version") != cls.FORMAT_VERSION
+                    or header.get("sources") != sources):
+                header = cls._compile(folder, cache_file, sources)
+            cls.folder = folder
+            cls.cache_file = cache_file
+            cls.index = header["index"]
+            cls.names = header["names"]
+            cls.codes = sorted(cls.index)
+            cls.positions = {code: position for position, code in enumerate(cls.codes)}
+            cls.packs = {}
+
+
+    @classmethod
+    def _scan_sources(cls, folder: str) -> dict:
+        """ Returns the modification time of every json file in folder """
+        return {entry.name: entry.stat().st_mtime_ns for entry in os.scandir(folder)
+                if entry.name.endswith(".json")}
+
+
+    @classmethod
+    def _read_header(cls, cache_file: str) -> dict:
+        """ Returns the cache header, None if there's no usable cache """
+        try:
+            with open(cache_file, "rb") as cache:
+                header_line = cache.readline()
+            header = json.loads(header_line)
+        except (OSError, ValueError):
+            return None
+        cls.data_start = len(header_line)
+        cls.data = None
+        return header
+
+
+    @classmethod
+    def _compile(cls, folder: str, cache_file: str, sources: dict) -> dict:
+        """ Parses every source file and writes them in the cache file """
+        index, names, blobs = {}, {}, []
+        offset = 0
+        for filename in sorted(sources):
+            with open(os.path.join(folder, filename), "r") as myfile:
+                this_lang = json.load(myfile)
+            # Every file NEEDS to have LANGUAGE key
+            if not this_lang.get("LANGUAGE", None):
+                continue
+            code = os.path.splitext(filename)[0]
+            blob = json.dumps(this_lang, ensure_ascii=False).encode("utf-8")
+            index[code] = [offset, len(blob)]
+            names[code] = this_lang["LANGUAGE"]
+            blobs.append(blob)
+            offset += len(blob)
+
+        header = {"version": cls.FORMAT_VERSION, "sources": sources, "index": index, "names": names}
+        header_line = json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n"
+        cls.data_start = len(header_line)
+        cls.data = None
+        try:
+            temp_file = cache_file + ".tmp"
+            with open(temp_file, "wb") as cache:
+                cache.write(header_line)
+                cache.writelines(blobs)
+            os.replace(temp_file, cache_file) # Readers never see a half written cache
+        except OSError: # Read-only install, compiling on every start is still correct
+            cls.data = header_line + b"".join(blobs)
+        cls.stats["compiles"] += 1
+        return header
+
+
+    @classmethod
+    def get_pack(cls, code: str) -> dict:
+        """ Returns the pack of a language, reading only its bytes from the cache """
+        pack = cls.packs.get(code)
+        if pack is None:
+            offset, length = cls.index[code]
+            start = cls.data_start + offset
+            if cls.data is not None:
+                blob = cls.data[start:start + length]
+            else:
+                with open(cls.cache_file, "rb") as cache:
+                    cache.seek(start)
+                    blob = cache.read(length)
+            pack = cls.packs[code] = json.loads(blob.decode("utf-8"))
+            cls.stats["packs_parsed"] += 1
+        return pack
+
+
+    @classmethod
+    def code_for_name(cls, name: str) -> str:
+        """ Returns the code of the pack with this LANGUAGE (case insensitive), None if missing """
+        for code, this_name in cls.names.items():
+            if this_name.lower() == name.lower():
+                return code
+        return None
+
+
+    @classmethod
+    def next_code(cls) -> str:
+        """ Returns the language that comes after the current one """
+        position = cls.positions.get(cls.current_code, -1)
+        return cls.codes[(position + 1) % len(cls.codes)]
+
+
+    @classmethod
+    def set_current(cls, code: str) -> None:
+        """ Marks a language as current and tells every listener """
+        cls.current_code = code
+        for listener in list(cls.listeners):
+            callback = listener()
+            if callback is None: # Its object is gone
+                cls.listeners.remove(listener)
+            else:
+                callback(code)
+
+
+    @classmethod
+    def add_listener(cls, callback) -> None:
+        """ callback(code) will be called after every language change, objects
+            aren't kept alive just because one of their methods is listening """
+        if hasattr(callback, "__self__"):
+            listener = weakref.WeakMethod(callback)
+        else:
+            listener = lambda: callback
+        if listener not in cls.listeners:
+            cls.listeners.append(listener)
+
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        return dict(cls.stats, languages=len(cls.codes), packs_loaded=len(cls.packs))
@@ -60,8 +60,8 @@ class MovieEffect:
             self.upper_band_rect.update(0, 0, CST.SCREEN_WIDTH, self.current_height)
             self.lower_band_rect.update(0, CST.SCREEN_HEIGHT - self.current_height, CST.SCREEN_WIDTH, CST.SCREEN_HEIGHT)
 
-        pygame.draw.rect(window, CST.COLOR_BLACK, self.upper_band_rect)
-        pygame.draw.rect(window, CST.COLOR_BLACK, self.lower_band_rect)
+        window.fill(CST.COLOR_BLACK, self.upper_band_rect)
+        window.fill(CST.COLOR_BLACK, self.lower_band_rect)
 
 
 
@@ -5,6 +5,7 @@
 import pygame
 import ssd_constants as CST
 from ssd_constants import pressed
+import ssd_voice_manager as vmg
 
 
 class Player_pawn(pygame.sprite.Sprite):
@@ -61,9 +62,9 @@ class Player_pawn(pygame.sprite.Sprite):
     def play_impact_sound(self) -> None:
         """ Plays an impact sounds based on current health """
         if self.health == 0:
-            self.death_sound.play()
+            vmg.VoiceManager.play(self.death_sound, "player", priority=2) # Never lost behind an impact
             return
-        self.impact_sound.play()
+        vmg.VoiceManager.play(self.impact_sound, "player", priority=1)
 
 
     def is_invulnerable(self) -> bool:
@@ -125,7 +126,7 @@ class Player_pawn(pygame.sprite.Sprite):
 
     def powerup_collected(self) -> None:
         """ Plays the collection sound """
-        self.powerup_collected_sound.play()
+        vmg.VoiceManager.play(self.powerup_collected_sound, "pickup")
 
 
     def game_tick_update(self, window):
@@ -158,9 +159,8 @@ class Lifebar(pygame.sprite.Sprite):
 
     def game_tick_update(self, window):
         current_health = self.player.health
-        for lifepoint in range(current_health):
-            coord_x = CST.SCREEN_WIDTH - (lifepoint+1) * 32
-            window.blit(self.sprite_image, (coord_x, self.y))
+        window.blits([(self.sprite_image, (CST.SCREEN_WIDTH - (lifepoint+1) * 32, self.y))
+                      for lifepoint in range(current_health)], False)
         if self.player.get_repair_status() > 0:
             newscale = int(self.UI_SPRITE_SIZE * (self.player.get_repair_status() / 100))
             smallsprite = pygame.transform.scale(self.sprite_image, (newscale, newscale))
@@ -3,24 +3,35 @@
 # SpaceStoneDodger: PowerUp and PowerUp Field Classes
 
 import pygame
-from random import randint
 import ssd_constants as CST
 from ssd_constants import pressed
 import ssd_field as fld
+import ssd_event_bus as evb
 
 
 
 class PowerUp(pygame.sprite.Sprite):
     """ PowerUp Class: a single power up object """
 
-    # Class constants
-    SPRITE_IMAGE = CST.METAL_SCRAP_SPRITE
-    HEIGHT = SPRITE_IMAGE.get_height()
-    WIDTH = SPRITE_IMAGE.get_width()
+    # Class constants, filled by load_sprite() on first use
+    SPRITE_IMAGE = None
+    HEIGHT = 0
+    WIDTH = 0
 
     external_speed_modifier = 1
 
+    @classmethod
+    def load_sprite(cls) -> None:
+        """ Loads the shared sprite, only the first time """
+        if cls.SPRITE_IMAGE is not None:
+            return
+        cls.SPRITE_IMAGE = CST.AssetManager.get_image("metal_scrap2.png")
+        cls.HEIGHT = cls.SPRITE_IMAGE.get_height()
+        cls.WIDTH = cls.SPRITE_IMAGE.get_width()
+
+
     def __init__(self, x: int, y: int, speed: int) -> None:
+        PowerUp.load_sprite()
         self.radius = PowerUp.WIDTH // 2
         self.rect = PowerUp.SPRITE_IMAGE.get_rect()
         self.relocate(x, y, speed)
@@ -33,10 +44,19 @@ class PowerUp(pygame.sprite.Sprite):
         self.speed = speed
 
 
-    def game_tick_update(self, window: pygame.Surface) -> None:
+    def move(self) -> None:
         """ Moves the power up left """
         self.x -= self.speed * PowerUp.external_speed_modifier
         self.rect.x, self.rect.y = self.x, self.y
+
+
+    def blit_data(self) -> tuple:
+        """ Returns the (surface, position) pair to draw, fields batch them into one blits() call """
+        return (PowerUp.SPRITE_IMAGE, (self.x, self.y))
+
+
+    def game_tick_update(self, window: pygame.Surface) -> None:
+        self.move()
         window.blit(PowerUp.SPRITE_IMAGE, (self.x, self.y))
 
 
@@ -48,8 +68,9 @@ class PowerUp(pygame.sprite.Sprite):
 
 class PowerUpField(fld.Field_of):
 
-    def __init__(self, howmany, player):
+    def __init__(self, howmany, player, stream_name: str = None):
         self.player = player
+        PowerUp.load_sprite()
         self.Y_OFFSET = PowerUp.HEIGHT // 2
         self.spawn_parameters = {
             "x_from": CST.SCREEN_WIDTH,
@@ -59,7 +80,7 @@ class PowerUpField(fld.Field_of):
             "min_speed": CST.POWER_UP_SPEED,
             "max_speed": CST.POWER_UP_SPEED
         }
-        super().__init__(PowerUp, howmany, self.spawn_parameters)
+        super().__init__(PowerUp, howmany, self.spawn_parameters, stream_name)
 
 
     def handle_movement(self, keys_pressed: list) -> None:
@@ -71,15 +92,20 @@ class PowerUpField(fld.Field_of):
         PowerUp.external_speed_modifier = speed_modifier
         
 
-    def other_stuff_for_each(self, element):
+    def other_stuff_for_all(self):
         """ Overriding from super() class to add collision checking """
         # Collisions checking, player can't get powerup if still invulnerable from a hit
-        collided = pygame.sprite.collide_circle(element, self.player)
-        if collided and not self.player.is_invulnerable():
-            pygame.event.post(pygame.event.Event(CST.POWER_UP_COLLECTED))
+        if self.player.is_invulnerable():
+            return
+        for index in self.colliding_with(self.player):
+            element = self.elements[index]
+            evb.post(self.event_bus, CST.POWER_UP_COLLECTED, source=element, x=element.x, y=element.y)
             # PowerUps collected are moved off screen to simulate their removal
             element.relocate(-100, element.y, element.speed)
-        
+
+
+    def other_stuff_for_each(self, element):
+        """ Overriding from super() class to slow down elements when asked """
         if self.stop_all:
             if element.speed > 0:
                 element.speed = 0.5
@@ -0,0 +1,98 @@
+# SpaceStoneDodger: Background Preloader
+# Reads and decodes upcoming assets on a worker thread, so the main thread only
+# has to pick up the result when the asset is actually needed
+
+import threading
+import queue
+import time as t
+
+
+
+class Preloader:
+    """ One worker thread shared by the whole game, jobs are identified by a hashable key """
+
+    jobs = queue.Queue() # (key, loader) pairs waiting for the worker
+    results = {} # key as keys, whatever the loader returned as values
+    pending = set() # Keys queued or being loaded right now
+    failed = {} # key as keys, the exception raised by its loader as values
+    load_times = {} # key as keys, SECONDS spent by the worker loading it as values
+    lock = threading.Lock()
+    worker = None
+
+    @classmethod
+    def _start_worker(cls) -> None:
+        if cls.worker is None or not cls.worker.is_alive():
+            cls.worker = threading.Thread(target=cls._work, name="ssd-preloader", daemon=True)
+            cls.worker.start()
+
+
+    @classmethod
+    def _work(cls) -> None:
+        """ Worker thread loop: runs loaders one at a time """
+        while True:
+            key, loader = cls.jobs.get()
+            start = t.perf_counter()
+            try:
+                result = loader()
+            except Exception as error: # A failed preload just means loading on demand later
+                with cls.lock:
+                    cls.failed[key] = error
+                    cls.pending.discard(key)
+            else:
+                with cls.lock:
+                    cls.results[key] = result
+                    cls.load_times[key] = t.perf_counter() - start
+                    cls.pending.discard(key)
+            cls.jobs.task_done()
+
+
+    @classmethod
+    def preload(cls, key, loader) -> None:
+        """ Queues loader() to be run on the worker, unless key is already loaded or queued
+            loader must not touch the display: converting surfaces is main thread work """
+        with cls.lock:
+            if key in cls.results or key in cls.pending:
+                return
+            cls.pending.add(key)
+            cls.failed.pop(key, None)
+        cls.jobs.put((key, loader))
+        cls._start_worker()
+
+
+    @classmethod
+    def is_ready(cls, key) -> bool:
+        with cls.lock:
+            return key in cls.results
+
+
+    @classmethod
+    def take(cls, key, wait: bool = False):
+        """ Returns and forgets the result of a preload, None if it isn't ready
+            wait: if the job is still queued or running, block until it's done """
+        if wait:
+            cls.wait_for(key)
+        with cls.lock:
+            return cls.results.pop(key, None)
+
+
+    @classmethod
+    def wait_for(cls, key, timeout: float = 5.0) -> None:
+        """ Blocks until a queued job is done (or timeout SECONDS are passed) """
+        deadline = t.perf_counter() + timeout
+        while t.perf_counter() < deadline:
+            with cls.lock:
+                if key not in cls.pending:
+                    return
+            t.sleep(0.001)
+
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """ Returns how many jobs are ready/pending/failed and the worker load times in SECONDS """
+        with cls.lock:
+            return {
+                "ready": len(cls.results),
+                "pending": len(cls.pending),
+                "failed": len(cls.failed),
+                "load_times": dict(cls.load_times),
+            }
@@ -0,0 +1,114 @@
+# SpaceStoneDodger: Replays
+# A replay is the run seed plus the input mask of every frame, run-length encoded,
+# and optionally the simulation checksums taken while recording (see ssd_checksum).
+# File layout (little endian):
+#   header:    b"SSDR", version (u8), flags (u8), seed (u32), frames (u32), runs (u32),
+#              checksum interval (u16), checksums (u32), actions length (u8)
+#              flags: FLAG_GOD_MODE if the player was invulnerable from the start
+#   actions:   ascii, comma separated
+#   body:      runs of (frames (u16), input mask (u8)), then the checksums (u32 each)
+
+import struct
+
+
+
+MAGIC = b"SSDR"
+VERSION = 1
+HEADER = struct.Struct("<4sBBIIIHIB")
+RUN = struct.Struct("<HB")
+CHECKSUM = struct.Struct("<I")
+MAX_RUN = 0xFFFF # Longer runs are split
+MAX_ACTIONS = 8 # One bit per action in the u8 input mask of RUN
+FLAG_GOD_MODE = 1
+
+
+
+class ReplayError(Exception):
+    """ The file isn't a replay this version can read """
+
+
+
+class ReplayRecorder:
+    """ Collects the input masks of a run, one record() per frame """
+
+    def __init__(self, seed: int, actions: list) -> None:
+        if len(actions) > MAX_ACTIONS:
+            raise ReplayError(f"Replays can record up to {MAX_ACTIONS} actions, not {len(actions)}")
+        self.seed = seed
+        self.actions = list(actions)
+        self.runs = [] # [frames, mask] pairs
+        self.frames = 0
+        self.checksum_interval = 0
+        self.checksums = [] # Filled by whoever computes them, see ssd_checksum.ChecksumLog
+        self.god_mode = False # The run must be played back with the same invulnerability
+
+
+    def record(self, mask: int) -> None:
+        if self.runs and self.runs[-1][1] == mask and self.runs[-1][0] < MAX_RUN:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, mask])
+        self.frames += 1
+
+
+    def to_bytes(self) -> bytes:
+        actions = ",".join(self.actions).encode("ascii")
+        flags = FLAG_GOD_MODE if self.god_mode else 0
+        header = HEADER.pack(MAGIC, VERSION, flags, self.seed, self.frames, len(self.runs),
+                             self.checksum_interval, len(self.checksums), len(actions)) + actions
+        runs = b"".join(RUN.pack(frames, mask) for frames, mask in self.runs)
+        return header + runs + b"".join(CHECKSUM.pack(checksum) for checksum in self.checksums)
+
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as replay_file:
+            replay_file.write(self.to_bytes())
+
+
+
+class Replay:
+    """ A recorded run, ready to be played back """
+
+    def __init__(self, seed: int, actions: list, runs: list, checksum_interval: int = 0, checksums: list = None,
+                 god_mode: bool = False) -> None:
+        self.seed = seed
+        self.actions = actions
+        self.runs = runs
+        self.frames = sum(frames for frames, _ in runs)
+        self.checksum_interval = checksum_interval
+        self.checksums = [] if checksums is None else checksums
+        self.god_mode = god_mode
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        if len(data) < HEADER.size:
+            raise ReplayError("Replay too short")
+        (magic, version, flags, seed, frames, run_count,
+         checksum_interval, checksum_count, actions_length) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError(f"Not a version {VERSION} replay")
+        body_start = HEADER.size + actions_length
+        actions = data[HEADER.size:body_start].decode("ascii").split(",")
+        if len(data) - body_start != run_count * RUN.size + checksum_count * CHECKSUM.size:
+            raise ReplayError("Truncated replay")
+        checksums_start = body_start + run_count * RUN.size
+        runs = [list(run) for run in RUN.iter_unpack(data[body_start:checksums_start])]
+        checksums = [checksum for (checksum,) in CHECKSUM.iter_unpack(data[checksums_start:])]
+        replay = cls(seed, actions, runs, checksum_interval, checksums, bool(flags & FLAG_GOD_MODE))
+        if replay.frames != frames:
+            raise ReplayError(f"Replay says {frames} frames, its runs have {replay.frames}")
+        return replay
+
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as replay_file:
+            return cls.from_bytes(replay_file.read())
+
+
+    def masks(self):
+        """ Yields the input mask of every frame, in order """
+        for frames, mask in self.runs:
+            for _ in range(frames):
+                yield mask
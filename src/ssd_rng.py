@@ -0,0 +1,94 @@
+# SpaceStoneDodger: Random Number Service
+# Every random number of the game comes from a named stream derived from the run
+# seed: same seed, same game. Set SSD_SEED to replay a run exactly
+# The helpers below are plain loops over random(), not vectorized: the list and NumPy
+# field backends must draw the very same sequence, and NumPy is optional
+
+import random
+import zlib
+from collections import deque
+import ssd_constants as CST
+
+
+
+class RandomStream(random.Random):
+    """ A random.Random with helpers drawing several integers at once, one per field (or other named consumer) """
+
+    def randint(self, a: int, b: int) -> int:
+        """ Same contract as random.randint(), drawn like randint_each() so every helper shares one sequence """
+        return a + int(self.random() * (b - a + 1))
+
+
+    def randint_each(self, ranges: tuple) -> list:
+        """ One integer for each (low, high) range, both ends included, like randint() """
+        rand = self.random
+        return [low + int(rand() * (high - low + 1)) for low, high in ranges]
+
+
+    def randint_list(self, low: int, high: int, count: int) -> list:
+        """ count integers between low and high, both included """
+        rand, span = self.random, high - low + 1
+        return [low + int(rand() * span) for _ in range(count)]
+
+
+    def randint_table(self, ranges: tuple, count: int) -> list:
+        """ count lists of randint_each(ranges), drawn row after row like count randint_each() calls """
+        rand = self.random
+        return [[low + int(rand() * (high - low + 1)) for low, high in ranges] for _ in range(count)]
+
+
+
+class RandomService:
+    """ Run seeds and the named streams derived from them """
+
+    seeds = random.Random(CST.RUN_SEED) # Where run seeds come from, random if SSD_SEED is not set
+    forced_seeds = deque() # Seeds the next runs must use, for replays
+    run_seed = None
+    streams = {} # Stream names as keys, RandomStreams of the current run as values
+
+    @classmethod
+    def begin_run(cls) -> int:
+        """ Starts a new run (a level, usually) with a new seed and fresh streams, returns the seed """
+        if cls.forced_seeds:
+            cls.run_seed = cls.forced_seeds.popleft()
+        else:
+            cls.run_seed = cls.seeds.getrandbits(32)
+        cls.streams = {}
+        return cls.run_seed
+
+
+    @classmethod
+    def force_next_seed(cls, seed: int) -> None:
+        """ The next begin_run() will use this seed """
+        cls.forced_seeds.append(seed)
+
+
+    @classmethod
+    def stream(cls, name: str) -> RandomStream:
+        """ Returns the stream called name in the current run """
+        if cls.run_seed is None:
+            cls.begin_run()
+        if name not in cls.streams:
+            cls.streams[name] = RandomStream(cls.seed_for(name))
+        return cls.streams[name]
+
+
+    @classmethod
+    def new_stream(cls, name: str) -> RandomStream:
+        """ Returns a stream nobody else in the current run uses: a field asking for a name
+            already taken (two fields of the same kind) gets name#2, name#3... """
+        if cls.run_seed is None:
+            cls.begin_run()
+        unique_name, copies = name, 1
+        while unique_name in cls.streams:
+            copies += 1
+            unique_name = f"{name}#{copies}"
+        return cls.stream(unique_name)
+
+
+    @classmethod
+    def seed_for(cls, name: str) -> int:
+        """ Derives the seed of a stream from the run seed, same name same seed """
+        if cls.run_seed is None:
+            cls.begin_run()
+        return zlib.crc32(name.encode("utf-8"), cls.run_seed)
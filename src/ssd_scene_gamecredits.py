@@ -9,6 +9,7 @@ import ssd_starfield as stf
 import ssd_background as bg
 import ssd_text_classes as txt
 import ssd_scene_master_class as Scn
+import ssd_frame_scheduler as fsc
 
 
 
@@ -20,18 +21,6 @@ class CreditsMovingText(txt.StaticText):
     is_boosted = False
 
 
-    def game_tick_update(self, window: pygame.Surface):
-        super().game_tick_update(window)
-        # Moving text up, ready for the next frame
-        self.pos_y -= CreditsMovingText.get_current_speed()
-        self.place_me()
-
-
-    def is_offscreen_top(self) -> bool:
-        """ Returns if the text is outside the top boundary of the screen """
-        return self.pos_y < (0 - self.titlerect.height)
-
-
     @classmethod
     def get_current_speed(cls) -> int:
         """ Returns the current speed (boosted or not) """
@@ -55,6 +44,60 @@ class CreditsMovingText(txt.StaticText):
 
 
 
+class CreditsRoll:
+    """ Every credit text composited once into a tall surface, then scrolled by blitting
+        only the slice inside the screen. One surface per language is kept. """
+
+    rendered_rolls = {} # Languages as keys, (surface, top y of the surface) as values
+
+    def __init__(self, texts: list) -> None:
+        """ texts are CreditsMovingText at their starting positions, the last one ends the roll """
+        self.texts = texts
+        self.scroll = 0 # How many pixels the credits moved up
+
+
+    def use_cached_language(self) -> bool:
+        """ Switches to the roll of the current language, returns False if it isn't built yet """
+        cached_roll = CreditsRoll.rendered_rolls.get(CST.get_text("LANGUAGE"))
+        if cached_roll is None:
+            return False
+        self.surface, self.top = cached_roll
+        return True
+
+
+    def build(self) -> None:
+        """ Composites the texts as they are right now, for the current language """
+        self.top = min(text.titlerect.top for text in self.texts)
+        bottom = max(text.titlerect.bottom for text in self.texts)
+        self.surface = pygame.Surface((CST.SCREEN_WIDTH, bottom - self.top), pygame.SRCALPHA)
+        for text in self.texts:
+            self.surface.blit(text.titletext, text.titlerect.move(0, -self.top))
+        CreditsRoll.rendered_rolls[CST.get_text("LANGUAGE")] = (self.surface, self.top)
+
+
+    def is_over(self) -> bool:
+        """ Returns if the last text went past the top of the screen """
+        last_text = self.texts[-1]
+        return last_text.pos_y - self.scroll < (0 - last_text.titlerect.height)
+
+
+    def reset(self) -> None:
+        """ Moves the credits back to their starting positions """
+        self.scroll = 0
+
+
+    def game_tick_update(self, window: pygame.Surface) -> None:
+        surface_y = self.top - self.scroll
+        # Only the part of the roll inside the screen gets blitted
+        visible_slice = pygame.Rect(0, max(0, -surface_y), CST.SCREEN_WIDTH, CST.SCREEN_HEIGHT)
+        window.blit(self.surface, (0, max(0, surface_y)), visible_slice)
+        # Moving text up, ready for the next frame
+        self.scroll += CreditsMovingText.get_current_speed()
+
+
+
+
+
 class GameCredits(Scn.Scene):
     def scene_related_init(self):
         SIZE_TEXT_BIGTITLE = 48
@@ -103,7 +146,7 @@ class GameCredits(Scn.Scene):
         ]
 
         self.level_background = bg.Background()
-        self.starfield = stf.Starfield(15)
+        self.starfield = stf.LayeredStarfield(15, CST.STARFIELD_LAYERS)
 
         self.text_bigtitle = CreditsMovingText("", SIZE_TEXT_BIGTITLE, (CENTER_X, self.get_row(0)), CST.TXT.CENTER)
         self.text_coding_title = CreditsMovingText("", SIZE_TEXT_CATEGORIES, (CENTER_X, self.get_row(1)), CST.TXT.CENTER)
@@ -138,44 +181,50 @@ class GameCredits(Scn.Scene):
         self.text_music_songauthor4 = CreditsMovingText("", SIZE_TEXT_REGULAR, (CENTER_X, self.get_row(30)), CST.TXT.CENTER)
         self.text_final_thanks = CreditsMovingText("", SIZE_TEXT_CATEGORIES, (CENTER_X, self.get_row(31)), CST.TXT.CENTER)
 
+        self.credit_texts = [ # Top to bottom, they're composited into self.credits_roll
+            self.text_bigtitle,
+            self.text_coding_title,
+            self.text_coding_content,
+            self.text_graphics_title,
+            self.text_font_title,
+            self.text_font_creator,
+            self.text_font_link,
+            self.text_background_title,
+            self.text_background_creator,
+            self.text_background_link,
+            self.text_other_graphics_title,
+            self.text_other_graphics_author,
+            self.text_sounds_title,
+            self.text_sounds_impactdeath,
+            self.text_sounds_impactdeath_creator,
+            self.text_sounds_impactdeath_link,
+            self.text_sounds_texttick,
+            self.text_sounds_texttick_creator,
+            self.text_sounds_texttick_link,
+            self.text_sounds_powerup,
+            self.text_sounds_powerup_creator,
+            self.text_sounds_powerup_link,
+            self.text_music_title,
+            self.text_music_songname1,
+            self.text_music_songauthor1,
+            self.text_music_songname2,
+            self.text_music_songauthor2,
+            self.text_music_songname3,
+            self.text_music_songauthor3,
+            self.text_music_songname4,
+            self.text_music_songauthor4,
+            self.text_final_thanks,
+        ]
+        self.credits_roll = CreditsRoll(self.credit_texts)
+
         # Append order is draw order
         self.updatelist.append(self.level_background)
         self.updatelist.append(self.starfield)
-        self.updatelist.append(self.text_bigtitle)
-        self.updatelist.append(self.text_coding_title)
-        self.updatelist.append(self.text_coding_content)
-        self.updatelist.append(self.text_graphics_title)
-        self.updatelist.append(self.text_font_title)
-        self.updatelist.append(self.text_font_creator)
-        self.updatelist.append(self.text_font_link)
-        self.updatelist.append(self.text_background_title)
-        self.updatelist.append(self.text_background_creator)
-        self.updatelist.append(self.text_background_link)
-        self.updatelist.append(self.text_other_graphics_title)
-        self.updatelist.append(self.text_other_graphics_author)
-        self.updatelist.append(self.text_sounds_title)
-        self.updatelist.append(self.text_sounds_impactdeath)
-        self.updatelist.append(self.text_sounds_impactdeath_creator)
-        self.updatelist.append(self.text_sounds_impactdeath_link)
-        self.updatelist.append(self.text_sounds_texttick)
-        self.updatelist.append(self.text_sounds_texttick_creator)
-        self.updatelist.append(self.text_sounds_texttick_link)
-        self.updatelist.append(self.text_sounds_powerup)
-        self.updatelist.append(self.text_sounds_powerup_creator)
-        self.updatelist.append(self.text_sounds_powerup_link)
-        self.updatelist.append(self.text_music_title)
-        self.updatelist.append(self.text_music_songname1)
-        self.updatelist.append(self.text_music_songauthor1)
-        self.updatelist.append(self.text_music_songname2)
-        self.updatelist.append(self.text_music_songauthor2)
-        self.updatelist.append(self.text_music_songname3)
-        self.updatelist.append(self.text_music_songauthor3)
-        self.updatelist.append(self.text_music_songname4)
-        self.updatelist.append(self.text_music_songauthor4)
-        self.updatelist.append(self.text_final_thanks)
+        self.updatelist.append(self.credits_roll)
 
         self.text_to_update()
         CreditsMovingText.set_speeds(self.CREDIT_SPEED, self.CREDIT_BOOSTED_SPEED)
+        CST.open_language_store().add_listener(self.prerender_language)
 
 
     def load_and_start_music(self):
@@ -183,6 +232,11 @@ class GameCredits(Scn.Scene):
         CST.Jukebox.playsong(CST.MUSIC_MENU)
 
 
+    @classmethod
+    def preload_assets(cls) -> None:
+        CST.Jukebox.preload(CST.MUSIC_MENU)
+
+
     def keys_to_check(self, key_list):
         # Speed up if SPACE is pressed
         CreditsMovingText.boost(False)
@@ -191,13 +245,9 @@ class GameCredits(Scn.Scene):
 
         # I'm secretly overriding this method to do stuff each frame
         # Quit after the last text
-        if self.text_final_thanks.is_offscreen_top():
+        if self.credits_roll.is_over():
             CST.Jukebox.stopmusic()
-            counter = 0
-            for element in self.updatelist: # Resetting text positions
-                if isinstance(element, CreditsMovingText):
-                    element.pos_y = self.get_row(counter)
-                    counter += 1
+            self.credits_roll.reset() # Back to the first text for the next time
             self.quit_loop(CST.SCENES.GAME_MENU)
         
 
@@ -206,7 +256,20 @@ class GameCredits(Scn.Scene):
         return sum(self.pos_y_list[:row+1])
 
 
+    def prerender_language(self, code: str) -> None:
+        """ Composites the credits in a new language during the spare time of the running scene """
+        fsc.FrameScheduler.run_when_idle(self.text_to_update)
+
+
     def text_to_update(self):
+        if self.credits_roll.use_cached_language(): # Already composited in this language
+            return
+        self.render_texts()
+        self.credits_roll.build()
+
+
+    def render_texts(self) -> None:
+        """ Renders every credit text in the current language """
         self.text_bigtitle.set_text("Space Stone Dodger")
         self.text_coding_title.set_text(f"- {CST.get_text('CREDITS001').upper()} -")
         self.text_coding_content.set_text("Simone 'Kenneth' Canova")
@@ -3,6 +3,7 @@
 # SpaceStonerDodger: Game Level Scene
 
 
+import os
 import pygame
 import ssd_constants as CST
 import ssd_player as plr
@@ -13,10 +14,20 @@ import ssd_powerup as pwr
 import ssd_text_classes as txt
 import ssd_scene_master_class as Scn
 import ssd_movie_effect as mov
+import ssd_rng as rng
+import ssd_replay as rpl
+import ssd_input as inp
+import ssd_checksum as cks
 
 
 class GameLevel(Scn.Scene):
+    last_recording = None # ReplayRecorder of the last level played
+
     def scene_related_init(self):
+        self.run_seed = rng.RandomService.begin_run() # Every random spawn of this level comes from it
+        self.recorder = rpl.ReplayRecorder(self.run_seed, self.input_map.actions)
+        self.replay_masks = None # Iterator of input masks when playing a replay back
+        self.set_checksum_interval(CST.CHECKSUM_INTERVAL)
         self.keypress_allowed = False
         self.num_power_ups = 0
         self.num_asteroids = 0
@@ -24,11 +35,18 @@ class GameLevel(Scn.Scene):
         self.score = 0
 
         self.level_background = bg.Background()
-        self.starfield = stf.Starfield(self.num_stars)
+        self.starfield = stf.LayeredStarfield(self.num_stars, CST.STARFIELD_LAYERS, "GameLevel.starfield")
         self.player = plr.Player_pawn(-50, CST.SCREEN_HEIGHT // 2)
         self.ui_lifebar = plr.Lifebar(self.player)
-        self.asteroid_field = ast.AsteroidField(self.num_asteroids, self.player)
-        self.powerup_field = pwr.PowerUpField(self.num_power_ups, self.player)
+        if CST.FIELD_BACKEND == "numpy":
+            self.asteroid_field = ast.ArrayAsteroidField(self.num_asteroids, self.player, "GameLevel.asteroids")
+        else:
+            self.asteroid_field = ast.AsteroidField(self.num_asteroids, self.player, "GameLevel.asteroids")
+        self.powerup_field = pwr.PowerUpField(self.num_power_ups, self.player, "GameLevel.powerups")
+        self.asteroid_field.event_bus = self.event_bus
+        self.powerup_field.event_bus = self.event_bus
+        self.event_bus.subscribe(CST.PLAYER_HIT, self.player_hit)
+        self.event_bus.subscribe(CST.POWER_UP_COLLECTED, self.power_up_collected)
         self.score_label = txt.StaticText(CST.get_text("LEVEL000") + ":", 14, (0,0), CST.TXT.LEFT)
         self.navigator_text = txt.AnimatedTypedText("", 14, (30, 300), 20, autostart=False)
         self.movie_effect = mov.MovieEffect(80, 20)
@@ -92,15 +110,25 @@ class GameLevel(Scn.Scene):
     def event_checking(self, this_event: pygame.event) -> None:
         super().event_checking(this_event) # for quitting handling
         if this_event.type == CST.PLAYER_HIT:
-            self.player.got_hit(CST.PLAYER_DEAD)
+            self.player_hit(this_event)
         if this_event.type == CST.PLAYER_DEAD:
             self.updatelist.remove(self.player)
             self.timeline.clear()
             self.timeline[self.timer_seconds_passed + 5] = self.tml_player_dead
         if this_event.type == CST.POWER_UP_COLLECTED:
-            self.player.powerup_collected()
-            self.score += 1
-            self.score_label.set_text(CST.get_text("LEVEL000") + ": " + str(self.score))
+            self.power_up_collected(this_event)
+
+
+    def player_hit(self, event) -> None:
+        """ An asteroid hit the player, from the event bus or pygame's queue """
+        self.player.got_hit(CST.PLAYER_DEAD)
+
+
+    def power_up_collected(self, event) -> None:
+        """ The player collected a power up, from the event bus or pygame's queue """
+        self.player.powerup_collected()
+        self.score += 1
+        self.score_label.set_text(CST.get_text("LEVEL000") + ": " + str(self.score))
 
 
     def keys_to_check(self, key_list: list) -> None:
@@ -112,7 +140,55 @@ class GameLevel(Scn.Scene):
         self.starfield.handle_movement(key_list)
 
 
+    def read_input(self) -> inp.InputState:
+        """ Recorded input when playing a replay back, the real one otherwise; both get recorded """
+        if self.replay_masks is None:
+            state = super().read_input()
+        else:
+            state = inp.InputState(next(self.replay_masks, 0), self.input_map)
+        self.recorder.record(state.mask)
+        return state
+
+
+    def set_checksum_interval(self, interval: int) -> None:
+        """ Checksums the simulation state every interval frames (0 is off), they're saved in the replay """
+        self.checksum_log = cks.ChecksumLog(interval)
+        self.recorder.checksum_interval = interval
+        self.recorder.checksums = self.checksum_log.checksums
+
+
+    def frame_step(self) -> None:
+        super().frame_step()
+        self.checksum_log.frame_done(self)
+
+
+    def god_mode(self, activated: bool) -> None:
+        """ Invulnerable player from the start of the level, saved in the replay to play it back the same way """
+        self.player.god_mode(activated)
+        self.recorder.god_mode = activated
+
+
+    def play_replay(self, replay: rpl.Replay) -> None:
+        """ Feeds a replay to this level instead of the keyboard, the level must be built with its seed """
+        if replay.seed != self.run_seed:
+            raise rpl.ReplayError(f"Level seed {self.run_seed} doesn't match replay seed {replay.seed}")
+        if replay.actions != self.input_map.actions:
+            raise rpl.ReplayError(f"Replay actions {replay.actions} don't match {self.input_map.actions}")
+        self.replay_masks = replay.masks()
+        self.god_mode(replay.god_mode)
+        if replay.checksum_interval: # Same checksums as the recording, to compare them
+            self.set_checksum_interval(replay.checksum_interval)
+
+
     def reset_state(self):
+        GameLevel.last_recording = self.recorder
+        if CST.REPLAY_DIR and self.replay_masks is None: # Saving a playback would overwrite the replay under test
+            os.makedirs(CST.REPLAY_DIR, exist_ok=True) # A missing folder shouldn't crash the game
+            self.recorder.save(os.path.join(CST.REPLAY_DIR, f"level_{self.run_seed}.ssdr"))
+        # Field elements go back to their pools, the next level will reuse them
+        self.asteroid_field.release_all()
+        self.powerup_field.release_all()
+        self.starfield.release_all()
         self.__init__(self.GAME_WINDOW) # Forcing the level to initial state when playing again
 
 
@@ -121,6 +197,13 @@ class GameLevel(Scn.Scene):
         CST.Jukebox.playsong(CST.MUSIC_GAMELEVEL)
 
 
+    @classmethod
+    def preload_assets(cls) -> None:
+        CST.Jukebox.preload(CST.MUSIC_GAMELEVEL)
+        for filename in ("Ship.png", "asteroid.png", "metal_scrap2.png"):
+            CST.AssetManager.preload_image(filename)
+
+
     def text_to_update(self):
         self.score_label.set_text(CST.get_text("LEVEL000") + ":")
 
@@ -290,6 +373,7 @@ class GameLevel(Scn.Scene):
     def tml_end_cinematic_1(self) -> None:
         self.player.god_mode(True)
         self.keypress_allowed = False
+        CST.Jukebox.preload(CST.MUSIC_ENDCINEMATIC) # Read in background, it starts in 18 seconds
         self.movie_effect.start_animation()
         self.player.automove_to(50, CST.SCREEN_HEIGHT // 2)
 
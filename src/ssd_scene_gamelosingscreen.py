@@ -17,6 +17,7 @@ import ssd_scene_master_class as Scn
 
 class GameLosingScreen(Scn.Scene):
     def scene_related_init(self):
+        self.dirty_rendering = True # Mostly static, only changed areas are redrawn
         SIZE_TEXT_BIG = 48
         SIZE_TEXT_SMALL = 18
         TITLE_COORDS = (CST.SCREEN_WIDTH // 2, CST.SCREEN_HEIGHT // 2)
@@ -47,6 +48,11 @@ class GameLosingScreen(Scn.Scene):
         CST.Jukebox.playsong(CST.MUSIC_LOSINGSCREEN)
 
 
+    @classmethod
+    def preload_assets(cls) -> None:
+        CST.Jukebox.preload(CST.MUSIC_LOSINGSCREEN)
+
+
     def text_to_update(self):
         self.text_title.set_text(CST.get_text("LOSE001"))
         self.goto_menu_label.set_text("[M] " + CST.get_text("LOSE002"))
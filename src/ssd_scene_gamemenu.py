@@ -27,7 +27,7 @@ class GameMenu(Scn.Scene):
         OPTION_COORDS = (CST.SCREEN_WIDTH // 2, CST.SCREEN_HEIGHT - SIZE_TEXT_TINY)
 
         self.level_background = bg.Background()
-        self.starfield = stf.Starfield(15)
+        self.starfield = stf.LayeredStarfield(15, CST.STARFIELD_LAYERS)
         self.player = plr.Player_pawn(CST.SCREEN_WIDTH // 2 - 16, CST.SCREEN_HEIGHT // 2 - 16)
         self.text_title = txt.StaticText("Space Stone Dodger", SIZE_TEXT_BIG, TITLE_COORDS, CST.TXT.CENTER)
         self.text_subtitle = txt.StaticText(CST.get_text("MENU001"), SIZE_TEXT_TINY, SUBTITLE_COORDS, CST.TXT.CENTER)
@@ -68,6 +68,11 @@ class GameMenu(Scn.Scene):
         CST.Jukebox.playsong(CST.MUSIC_MENU)
 
 
+    @classmethod
+    def preload_assets(cls) -> None:
+        CST.Jukebox.preload(CST.MUSIC_MENU)
+
+
     def text_to_update(self):
         self.text_subtitle.set_text(CST.get_text("MENU001"))
         self.text_goto_play.set_text("[P] " + CST.get_text("MENU002"))
@@ -8,11 +8,13 @@ import ssd_constants as CST
 import ssd_background as bg
 import ssd_text_classes as txt
 import ssd_scene_master_class as Scn
+import ssd_voice_manager as vmg
 
 
 
 class GameOptions(Scn.Scene):
     def scene_related_init(self):
+        self.dirty_rendering = True # Mostly static, only changed areas are redrawn
         SIZE_TEXT_BIG = 34
         SIZE_TEXT_MEDIUM = 24
         SIZE_TEXT_SMALL = 18
@@ -64,6 +66,11 @@ class GameOptions(Scn.Scene):
         self.update_all_text()
 
 
+    @classmethod
+    def preload_assets(cls) -> None:
+        CST.preload_languages()
+
+
     def get_sound_string(self) -> str:
         """ Builds the string for sound option """
         return f"[Q] <- {CST.get_text('OPTIONS001')}: {int(round(CST.get_sfx_volume(), 1) * 10)} -> [E]"
@@ -78,22 +85,12 @@ class GameOptions(Scn.Scene):
 
     def cycle_language(self) -> None:
         """ Sets the next language in list as current """
-        languagelist = CST.get_every_languages()
-        # Finding this language index
-        this_lang_index = 0
-        for language in languagelist:
-            if language["LANGUAGE"] == CST.get_text("LANGUAGE"):
-                this_lang_index = languagelist.index(language)
-                print("Index found:", this_lang_index)
-                break
-
-        this_lang_index = (this_lang_index + 1) % len(languagelist)
-        CST.set_text_db(languagelist[this_lang_index])
+        CST.cycle_language()
 
     def play_dummy_sound(self) -> None:
         """ Updates the sfx volume and plays the dummy sound """
         self.dummy_sound.set_volume(CST.get_sfx_volume())
-        self.dummy_sound.play()
+        vmg.VoiceManager.play(self.dummy_sound, "ui")
 
     def update_all_text(self) -> None:
         """ Forces all text to update """
@@ -28,11 +28,10 @@ class GameTutorial(Scn.Scene):
         BOTTOM_ROW = CST.SCREEN_HEIGHT - SIZE_TEXT_SMALL
 
         self.level_background = bg.Background()
-        self.starfield = stf.Starfield(15)
+        self.starfield = stf.LayeredStarfield(15, CST.STARFIELD_LAYERS)
         self.player = plr.Player_pawn(FIRST_COL, FIRST_ROW)
         self.player_life_bar = plr.Lifebar(self.player)
-        self.asteroid = ast.Asteroid(FIRST_COL, SECOND_ROW, 0)
-        self.asteroid.set_scale(48)
+        self.asteroid = ast.Asteroid(FIRST_COL, SECOND_ROW, 0, 48)
         self.powerup = pwr.PowerUp(FIRST_COL, THIRD_ROW, 0)
         self.player_label = txt.AnimatedTypedText(CST.get_text("TUTORIAL001"), SIZE_TEXT_MEDIUM, (SECOND_COL, FIRST_ROW), 1)
         self.asteroid_label = txt.AnimatedTypedText(CST.get_text("TUTORIAL002"), SIZE_TEXT_MEDIUM, (SECOND_COL, SECOND_ROW), 1)
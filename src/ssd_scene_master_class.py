@@ -3,23 +3,35 @@
 # SpaceStoneDodger: Scene Master class
 # This class implements the basic methods for running a scene
 
-# Thanks to William Hou from
-# https://gamedev.stackexchange.com/questions/102586/locking-the-frame-rate-in-pygame
-# for a mean to stabilyze the frame rate
-
 import pygame, sys
 import time as t
 import ssd_constants as CST
+import ssd_frame_scheduler as fsc
+import ssd_frame_profiler as fpr
+import ssd_dirty_renderer as dtr
+import ssd_event_bus as evb
+import ssd_input as inp
 
 
 
 class Scene:
+    cpu_usage_by_scene = {} # Scene class name as keys, CPU usage (% of one core) of its last run as values
+    profiler = fpr.FrameProfiler() if CST.PROFILING else fpr.NullProfiler() # Shared by every scene
+    start_time = None # perf_counter() of the game start, set by the launcher
+    first_frame_time = None # perf_counter() of the first frame ever shown, for startup measurements
+
     def __init__(self, GAME_WINDOW: pygame.Surface) -> None:
         """ Inizalization phase, always call the super().__init__ at the end of an overridden __init__ """
         self.GAME_WINDOW = GAME_WINDOW
         self.looping_active = True
         self.updatelist = []
         self.game_timer_step = 1 # Every X seconds
+        self.game_timer = 0 # Frames counted towards the next timer_duty()
+        self.frame_capped = CST.FRAME_CAPPED
+        self.dirty_rendering = False # Scenes that barely change can set it in scene_related_init
+        self.renderer = None
+        self.event_bus = evb.EventBus() # Game logic events, dispatched once per frame after pygame's
+        self.input_map = inp.InputMap.get_shared()
         self.scene_related_init()
 
 
@@ -39,7 +51,7 @@ class Scene:
 
 
     def keys_to_check(self, key_list: list) -> None:
-        """ Overridable to check different keys pressed """
+        """ Overridable to check different keys pressed, key_list is an ssd_input.InputState """
         pass
 
 
@@ -69,54 +81,103 @@ class Scene:
         pass
 
 
+    @classmethod
+    def preload_assets(cls) -> None:
+        """ To be overridden to queue on the preloader what the Scene needs when starting """
+        pass
+
+
     def text_to_update(self) -> None:
         """ To be overridden to update any text at the beginning of the scene """
         pass
 
-    def run(self) -> int:
-        """ Main loop method """
+    def run(self, max_frames: int = 0) -> int:
+        """ Main loop method, max_frames stops the scene after that many frames (0 means no limit) """
         self.load_and_start_music() # Starting music only when Scene is active
         self.text_to_update()
-        time = t.time()
-        unprocessed = 0
-        FRAME_CAP = 1.0 / CST.FPS # How many millisecons needs to pass each frame
-        game_timer = 0
+        if self.dirty_rendering:
+            if self.renderer is None:
+                self.renderer = dtr.DirtyRectRenderer(self.GAME_WINDOW)
+            self.renderer.invalidate() # The display shows another scene right now
+        scheduler = fsc.FrameScheduler(CST.FPS, self.frame_capped)
+        frames_done = 0
+        self.game_timer = 0
 
         # Main game loop
-        while self.looping_active:
-            can_render = False
-            time_2 = t.time()
-            passed = time_2 - time
-            unprocessed += passed
-            time = time_2
-
-            # Frame stabilyzer
-            while unprocessed >= FRAME_CAP:
-                unprocessed -= FRAME_CAP
-                can_render = True
-
-            # What happens each frame
-            if can_render:
-                game_timer += 1
-
-                for event in pygame.event.get():
-                    self.event_checking(event)
-                        
-                # Key state capturing
-                keys_pressed = pygame.key.get_pressed() # Gets the bool state of all keyboard buttons
-
-                # Key press checking
-                self.keys_to_check(keys_pressed)
-
-                # Drawing sequence
-                for gameobj in self.updatelist:
-                    gameobj.game_tick_update(self.GAME_WINDOW) # All classes have this methods
-                pygame.display.update()
-
-                # Game timer, used by scenes as thery want                
-                if game_timer % (self.game_timer_step * CST.FPS) == 0: # every X seconds
-                    game_timer = 0
-                    self.timer_duty()
-                
+        try: # Closing the window exits from inside the loop, its CPU usage still counts
+            while self.looping_active:
+                scheduler.wait_next_frame() # Sleeps until this frame is due
+                self.frame_step()
+                frames_done += 1
+                if Scene.first_frame_time is None:
+                    Scene.first_frame_time = t.perf_counter()
+                    if CST.PROFILING and Scene.start_time is not None:
+                        print(f"Time to first frame: {Scene.first_frame_time - Scene.start_time:.3f}s")
+                if frames_done == max_frames and self.looping_active: # The scene may have quit by itself
+                    self.quit_loop(None)
+        finally:
+            Scene.cpu_usage_by_scene[type(self).__name__] = scheduler.get_cpu_usage()
         self.reset_state()
-        return self.scene_return_data
\ No newline at end of file
+        return self.scene_return_data
+
+
+    def set_profiler(self, profiler: fpr.FrameProfiler) -> None:
+        """ Enables (or disables, passing None) per-frame timings for this scene """
+        self.profiler = fpr.NullProfiler() if profiler is None else profiler
+
+
+    def read_input(self) -> inp.InputState:
+        """ Returns the actions held in this frame, what keys_to_check() receives """
+        return self.input_map.snapshot()
+
+
+    def get_drawing_surface(self) -> pygame.Surface:
+        """ Returns where objects should draw, the renderer's canvas in dirty rendering """
+        if self.renderer is None:
+            return self.GAME_WINDOW
+        return self.renderer.canvas
+
+
+    def present_frame(self) -> None:
+        """ Updates the display, only the dirty areas in dirty rendering """
+        if self.renderer is None:
+            pygame.display.update()
+        else:
+            self.renderer.present()
+
+
+    def frame_step(self) -> None:
+        """ Advances the scene by exactly one frame, whatever the wall-clock time
+            Every section is timed into self.profiler, its calls do nothing when profiling is off """
+        profiler = self.profiler
+        profiler.start_frame(type(self).__name__)
+        self.game_timer += 1
+
+        for event in pygame.event.get():
+            self.event_checking(event)
+        profiler.mark("events")
+        self.event_bus.dispatch()
+        profiler.mark("event_bus")
+                
+        # Key state capturing
+        keys_pressed = self.read_input() # Every binding resolved once for the whole frame
+
+        # Key press checking
+        self.keys_to_check(keys_pressed)
+        profiler.mark("keys_to_check")
+
+        # Drawing sequence
+        window = self.get_drawing_surface()
+        for position, gameobj in enumerate(self.updatelist):
+            gameobj.game_tick_update(window) # All classes have this methods
+            profiler.mark_object(position, gameobj)
+        self.present_frame()
+        profiler.mark("display_update")
+
+        # Game timer, used by scenes as thery want                
+        if self.game_timer % (self.game_timer_step * CST.FPS) == 0: # every X seconds
+            self.game_timer = 0
+            self.timer_duty()
+            profiler.mark("timer_duty")
+
+        profiler.end_frame()
@@ -0,0 +1,79 @@
+# SpaceStoneDodger: Scene Registry
+# Builds scenes only when they're needed, prebuilds the likely next ones in the
+# spare time of the running scene (their assets on the preloader thread) and drops
+# the ones not used for a while
+
+import time as t
+import ssd_frame_scheduler as fsc
+
+
+
+class SceneRegistry:
+    """ Scene index -> scene object, with lazy construction and unloading """
+
+    def __init__(self, window, max_idle_runs: int = 4) -> None:
+        """ max_idle_runs: a scene is unloaded after this many runs of other scenes """
+        self.window = window
+        self.max_idle_runs = max_idle_runs
+        self.scene_classes = {}
+        self.likely_next = {} # Scene index as keys, tuple of indices worth prebuilding as values
+        self.prebuild_next = {} # Scene index as keys, False if its frames can't spare a whole scene build
+        self.scenes = {}
+        self.last_used = {} # Scene index as keys, value of self.runs when last built or run as values
+        self.runs = 0
+        self.build_times = {} # Scene index as keys, SECONDS spent building it the last time as values
+        self.pending_prebuilds = set()
+
+
+    def register(self, index: int, scene_class, likely_next: tuple = (), prebuild_next: bool = True) -> None:
+        """ Tells the registry how to build a scene and which scenes usually follow it
+            prebuild_next: False only preloads the assets of the next scenes, for scenes (like gameplay)
+            where a scene constructor would overrun a frame """
+        self.scene_classes[index] = scene_class
+        self.likely_next[index] = likely_next
+        self.prebuild_next[index] = prebuild_next
+
+
+    def get(self, index: int):
+        """ Returns a scene, building it now if needed """
+        if index not in self.scenes:
+            start = t.perf_counter()
+            self.scenes[index] = self.scene_classes[index](self.window)
+            self.build_times[index] = t.perf_counter() - start
+            self.last_used[index] = self.runs
+        self.pending_prebuilds.discard(index)
+        return self.scenes[index]
+
+
+    def prebuild(self, index: int) -> None:
+        """ Builds a scene in the spare time between frames of the running scene """
+        if index in self.scenes or index in self.pending_prebuilds:
+            return
+        self.pending_prebuilds.add(index)
+        # A scene not built yet has no known cost, the scheduler assumes half a frame
+        fsc.FrameScheduler.run_when_idle(lambda: self.get(index), self.build_times.get(index))
+
+
+    def unload_unused(self) -> None:
+        """ Drops the scenes that haven't been used in the last max_idle_runs runs """
+        for index in list(self.scenes):
+            if self.runs - self.last_used[index] > self.max_idle_runs:
+                del self.scenes[index]
+
+
+    def run(self, index: int) -> int:
+        """ Runs a scene and returns the index of the next one """
+        scene = self.get(index)
+        self.runs += 1
+        self.last_used[index] = self.runs
+        # Prebuilds queued for the previous scene would run inside this one's frames
+        fsc.FrameScheduler.clear_idle_jobs()
+        self.pending_prebuilds.clear()
+        for next_index in self.likely_next.get(index, ()):
+            self.scene_classes[next_index].preload_assets() # Disk and decoding on the worker thread
+            if self.prebuild_next[index]:
+                self.prebuild(next_index)
+        next_scene = scene.run()
+        self.unload_unused()
+        return next_scene
+
@@ -0,0 +1,86 @@
+# SpaceStoneDodger: Spatial Hash
+# Uniform grid for broad-phase collision queries: only elements sharing a cell
+# with the query area are returned as candidates, instead of the whole field
+
+from itertools import combinations
+
+
+
+class SpatialHash:
+    """ Maps grid cells to the keys (usually field elements) whose bounding circle overlaps them """
+
+    def __init__(self, cell_size: int = 128) -> None:
+        self.cell_size = cell_size
+        self.cells = {} # (column, row) as keys, sets of element keys as values
+        self.entries = {} # element keys as keys, [cell bounds, layer] as values
+
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+    def _cell_bounds(self, x: float, y: float, radius: float) -> tuple:
+        """ Returns the first and last column and row covered by a circle """
+        size = self.cell_size
+        return (int((x - radius) // size), int((y - radius) // size),
+                int((x + radius) // size), int((y + radius) // size))
+
+
+    def _cells_in(self, bounds: tuple):
+        """ Yields every cell inside some bounds """
+        first_col, first_row, last_col, last_row = bounds
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                yield (col, row)
+
+
+    def update(self, key, x: float, y: float, radius: float, layer=None) -> None:
+        """ Inserts or moves an element, cells are touched only when it crosses a cell border """
+        bounds = self._cell_bounds(x, y, radius)
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[0] == bounds:
+                return
+            self.remove(key)
+        self.entries[key] = [bounds, layer]
+        for cell in self._cells_in(bounds):
+            self.cells.setdefault(cell, set()).add(key)
+
+
+    def remove(self, key) -> None:
+        """ Takes an element out of the grid, unknown keys are ignored """
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for cell in self._cells_in(entry[0]):
+            cell_content = self.cells[cell]
+            cell_content.discard(key)
+            if not cell_content:
+                del self.cells[cell]
+
+
+    def clear(self) -> None:
+        """ Empties the whole grid """
+        self.cells.clear()
+        self.entries.clear()
+
+
+    def query_circle(self, x: float, y: float, radius: float, layer=None) -> set:
+        """ Returns the keys sharing a cell with the circle, only from one layer if given """
+        candidates = set()
+        for cell in self._cells_in(self._cell_bounds(x, y, radius)):
+            candidates.update(self.cells.get(cell, ()))
+        if layer is not None:
+            candidates = {key for key in candidates if self.entries[key][1] is layer}
+        return candidates
+
+
+    def query_pairs(self, layer=None) -> set:
+        """ Returns every pair of keys sharing at least one cell, only from one layer if given """
+        pairs = set()
+        for cell_content in self.cells.values():
+            if layer is not None:
+                cell_content = [key for key in cell_content if self.entries[key][1] is layer]
+            for first, second in combinations(cell_content, 2):
+                pairs.add((first, second) if id(first) < id(second) else (second, first))
+        return pairs
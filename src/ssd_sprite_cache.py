@@ -0,0 +1,61 @@
+# pylint: disable=no-member
+
+# SpaceStoneDodger: Scaled Sprite Cache
+# Keeps pre-scaled copies of a sprite, so spawning objects costs no transform work
+# and objects with the same size share the same surface
+
+import pygame
+from collections import OrderedDict
+
+
+
+class ScaledSpriteCache:
+    """ Bounded LRU cache of square scaled copies of one sprite """
+
+    def __init__(self, source: pygame.Surface, quantum: int = 1, max_entries: int = 128) -> None:
+        """ Sizes are rounded to the nearest multiple of quantum (1 means exact sizes) """
+        self.source = source
+        self.quantum = max(1, quantum)
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict() # size as keys, scaled surfaces as values
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def quantize(self, size: int) -> int:
+        """ Returns the size bucket a requested size falls into """
+        return max(self.quantum, (size + self.quantum // 2) // self.quantum * self.quantum)
+
+
+    def get(self, size: int) -> pygame.Surface:
+        """ Returns the sprite scaled to size x size, size should already be quantized """
+        surface = self.surfaces.get(size)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(size)
+            return surface
+
+        self.misses += 1
+        surface = pygame.transform.scale(self.source, (size, size))
+        self.surfaces[size] = surface
+        if len(self.surfaces) > self.max_entries: # Objects still using it keep their own reference
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+
+    def prewarm(self, smallest: int, biggest: int) -> None:
+        """ Scales every bucket between two sizes in advance """
+        for size in range(self.quantize(smallest), biggest + 1, self.quantum):
+            self.get(size)
+
+
+    def get_stats(self) -> dict:
+        """ Returns hit/miss counters and how many surfaces are cached """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.surfaces),
+        }
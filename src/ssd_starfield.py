@@ -3,9 +3,9 @@
 # SpaceStoneDodger: Star and Star Field Classes
 
 import pygame
-from random import randint
 import ssd_constants as CST
 import ssd_field as fld
+import ssd_rng as rng
 from ssd_constants import pressed
 
 
@@ -16,12 +16,16 @@ class Star(pygame.sprite.Sprite):
 
     external_speed_modifier = 1
 
-    def __init__(self, x: int, y: int, speed: int) -> None:
-        grayshade = randint(50, 125) # Random grey shade to simulate different stars distances
-        self.COLOR = (grayshade, grayshade, grayshade)
+    def __init__(self, x: int, y: int, speed: int, grayshade: int = 125) -> None:
+        self.set_shade(grayshade)
         self.relocate(x, y, speed)
 
 
+    def set_shade(self, grayshade: int) -> None:
+        """ Grey shade to simulate different stars distances, Starfield picks a random one """
+        self.COLOR = (grayshade, grayshade, grayshade)
+
+
     def relocate(self, x: int, y: int, speed: int) -> None:
         """ Used to change the position and speed of a star asteroid """
         self.x = x
@@ -47,7 +51,7 @@ class Star(pygame.sprite.Sprite):
 
 
 class Starfield(fld.Field_of):
-    def __init__(self, howmany: int):
+    def __init__(self, howmany: int, stream_name: str = None):
         self.spawn_parameters = {
             "x_from": 0, # temporally set to 0 to have a full screen initial spawn
             "x_to": CST.SCREEN_WIDTH * 2,
@@ -56,10 +60,16 @@ class Starfield(fld.Field_of):
             "min_speed": CST.STARS_SPEED,
             "max_speed": CST.STARS_SPEED
         }
-        super().__init__(Star, howmany, self.spawn_parameters)
+        super().__init__(Star, howmany, self.spawn_parameters, stream_name)
         # After an initial full screen spawn, we set the spawn zone correctly
         self.spawn_parameters["x_from"] = CST.SCREEN_WIDTH
 
+    def new_element(self):
+        """ New and pooled stars alike draw their shade once, right after their position """
+        element = super().new_element()
+        element.set_shade(self.rng.randint(50, 125))
+        return element
+
     def handle_movement(self, keys_pressed: list) -> None:
         """ Manages the speed modifier of the field based on key pressing """
         speed_modifier = 1
@@ -75,6 +85,74 @@ class Starfield(fld.Field_of):
 
 
 
+class LayeredStarfield:
+    """ Starfield pre-rendered once into wrap-around layers, then scrolled with two blits per layer
+        Farther layers scroll slower (parallax), a single layer moves like Starfield """
+    STREAK_LENGTH = 3 # in PIXELS, same as a boosted Star
+
+    def __init__(self, howmany: int, layers: int = 1, stream_name: str = None) -> None:
+        self.layers = []
+        stream = rng.RandomService.new_stream(stream_name or "LayeredStarfield")
+        for layer_index in range(layers):
+            stars_in_layer = howmany // layers + (layer_index < howmany % layers)
+            stars = list(zip(stream.randint_list(0, CST.SCREEN_WIDTH - 1, stars_in_layer),
+                             stream.randint_list(0, CST.SCREEN_HEIGHT, stars_in_layer),
+                             stream.randint_list(50, 125, stars_in_layer)))
+            self.layers.append({
+                "dots": self._render_layer(stars, streaks=False),
+                "streaks": self._render_layer(stars, streaks=True),
+                "speed": CST.STARS_SPEED * (layer_index + 1) / layers,
+                "offset": 0.0,
+            })
+        self.speed_modifier = 1
+        self.stop_all = False
+
+
+    def _render_layer(self, stars: list, streaks: bool) -> pygame.Surface:
+        """ Draws every star of a layer once, stars crossing the right edge wrap to the left """
+        layer = pygame.Surface((CST.SCREEN_WIDTH, CST.SCREEN_HEIGHT))
+        layer.fill(CST.COLOR_BLACK)
+        for x, y, grayshade in stars:
+            color = (grayshade, grayshade, grayshade)
+            for wrapped_x in (x, x - CST.SCREEN_WIDTH):
+                if streaks:
+                    end_pos = (wrapped_x + LayeredStarfield.STREAK_LENGTH, y)
+                    pygame.draw.line(layer, color, (wrapped_x, y), end_pos, Star.RADIUS)
+                else:
+                    pygame.draw.circle(layer, color, (wrapped_x, y), Star.RADIUS)
+        # Stars are never black, so black is transparent: RLE makes sparse layers very cheap to blit
+        layer.set_colorkey(CST.COLOR_BLACK, pygame.RLEACCEL)
+        return layer
+
+
+    def stop_movements(self) -> None:
+        """ Slows every layer down, like Starfield does with its stars """
+        self.stop_all = True
+
+
+    def release_all(self) -> None:
+        """ Same interface as Field_of, layers have no elements to give back """
+        pass
+
+
+    def handle_movement(self, keys_pressed: list) -> None:
+        """ Manages the speed modifier of the field based on key pressing """
+        self.speed_modifier = 1
+        if pressed("SPACE", keys_pressed):
+            self.speed_modifier = CST.BOOST_SPEED_MODIFIER
+
+
+    def game_tick_update(self, window: pygame.Surface) -> None:
+        for layer in self.layers:
+            speed = 0.5 if self.stop_all else layer["speed"]
+            layer["offset"] = (layer["offset"] + speed * self.speed_modifier) % CST.SCREEN_WIDTH
+            surface = layer["dots"] if self.speed_modifier == 1 else layer["streaks"]
+            layer_x = -int(layer["offset"])
+            window.blit(surface, (layer_x, 0))
+            window.blit(surface, (layer_x + CST.SCREEN_WIDTH, 0))
+
+
+
 # TESTING AREA
 if __name__ == "__main__":
     import sys
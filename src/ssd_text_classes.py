@@ -3,7 +3,44 @@
 # SpaceStoneDodger: Text utility Classes
 
 import pygame
+from functools import lru_cache
+from collections import OrderedDict
 import ssd_constants as CST
+import ssd_voice_manager as vmg
+
+
+
+def max_chars_fitting(font: pygame.font.Font, text: str, max_width: int) -> int:
+    """ Binary search of the longest beginning of text narrower than max_width pixels """
+    shortest, longest = 0, len(text)
+    while shortest < longest:
+        middle = (shortest + longest + 1) // 2
+        if font.size(text[:middle])[0] < max_width:
+            shortest = middle
+        else:
+            longest = middle - 1
+    return max(1, shortest) # At least a letter per row, or wrapping would never end
+
+
+@lru_cache(maxsize=256)
+def wrap_text(font_file: str, size: int, text: str, max_width: int) -> tuple:
+    """ Splits text into rows narrower than max_width pixels, layouts are memoized
+        per (font file, size, text, width) since the same lines come back on every replay.
+        Font objects are rebuilt when evicted, so they can't be part of the key """
+    font = CST.get_font(font_file, size)
+    final_row_list = []
+    for phrase in text.split('\n'):
+        max_chars = max_chars_fitting(font, phrase, max_width)
+        while len(phrase) > max_chars:
+            if ' ' in phrase[:max_chars]:
+                right_space = phrase[:max_chars].rfind(' ')
+            else:
+                right_space = max_chars
+
+            final_row_list.append(phrase[:right_space].strip())
+            phrase = phrase[right_space:].lstrip()
+        final_row_list.append(phrase)
+    return tuple(final_row_list)
 
 
 
@@ -13,7 +50,7 @@ class StaticText:
     def __init__(self, text: str, size: int, position: tuple, alignment: int = 0) -> None:
         self.alignment = alignment # Default is left
         self.pos_x, self.pos_y = position
-        self.titlefont = pygame.font.Font(CST.TITLE_FONT, size)
+        self.titlefont = CST.get_font(CST.TITLE_FONT, size) # Shared with every text of this size
         self.set_text(text)
 
     def set_text(self, new_text: str) -> None:
@@ -38,6 +75,10 @@ class StaticText:
 
 class AnimatedTypedText:
     """ Class for animated text """
+
+    glyph_cache = OrderedDict() # (font file, size, character) as keys, rendered glyphs as values, least recently used first
+    max_glyphs = 512 # Shared by every animated text, so all the letters of a few sizes fit
+
     def __init__(self, text: str, size: int, position: tuple, speed: int, autostart: bool = True) -> None:
         """ Speed is a positive integer, FPS are divided by speed:
             1: one letter per second
@@ -45,7 +86,8 @@ class AnimatedTypedText:
             ...and so on """
         self.sfx_text_tick = CST.SFX_TEXT_TICK
         self.pos_x, self.pos_y = position
-        self.titlefont = pygame.font.Font(CST.TITLE_FONT, size)
+        self.titlefont = CST.get_font(CST.TITLE_FONT, size) # Shared with every text of this size
+        self.font_key = (CST.TITLE_FONT, int(size)) # Fonts can be evicted and loaded again, their file and size stay the same
 
         self.total_text = text
         self._generate_row_surfaces(text) # setting up the full text
@@ -60,40 +102,68 @@ class AnimatedTypedText:
 
 
     def _generate_row_surfaces(self, new_text: str) -> None:
-        """ Updates the text and builds the rows dict"""
-        self.rows_and_rects = {} # text rows as keys, their rect as values
+        """ Lays out the whole text once: every row gets an empty surface that letters are typed on """
+        self.rows = []
         char_height = self.titlefont.size(new_text)[1]
-        row_count = 0
-        for row in self._rowify(new_text):
-            this_row_surface = self.titlefont.render(row, True, CST.COLOR_WHITE)
+        text_cursor = 0
+        for row_count, row in enumerate(self._rowify(new_text)):
+            row_start = new_text.find(row, text_cursor) # Where this row's letters are in the full text
+            text_cursor = row_start + len(row)
+            this_row_surface = pygame.Surface(self.titlefont.size(row), pygame.SRCALPHA)
             this_row_y = self.pos_y + row_count * char_height
-            self.rows_and_rects[row] = this_row_surface.get_rect().move(self.pos_x, this_row_y)
-            row_count += 1
+            self.rows.append({
+                "text": row,
+                "start": row_start,
+                "letters_typed": 0,
+                "surface": this_row_surface,
+                "rect": this_row_surface.get_rect().move(self.pos_x, this_row_y),
+            })
+        self.letters_revealed = 0
+
+
+    def _get_glyph(self, character: str) -> pygame.Surface:
+        """ Renders a single character once per font file and size """
+        key = (*self.font_key, character)
+        glyph_cache = AnimatedTypedText.glyph_cache
+        glyph = glyph_cache.get(key)
+        if glyph is not None:
+            glyph_cache.move_to_end(key)
+            return glyph
+        glyph = self.titlefont.render(character, True, CST.COLOR_WHITE)
+        glyph_cache[key] = glyph
+        if len(glyph_cache) > AnimatedTypedText.max_glyphs:
+            glyph_cache.popitem(last=False)
+        return glyph
+
+
+    def _reveal_letters(self, letters: int) -> None:
+        """ Types on the row surfaces every letter up to the given index of the full text """
+        if letters == self.letters_revealed:
+            return
+        if letters < self.letters_revealed: # Animation restarted, rows start blank again
+            for row in self.rows:
+                row["surface"].fill((0, 0, 0, 0))
+                row["letters_typed"] = 0
+
+        for row in self.rows:
+            row_text = row["text"]
+            target = max(0, min(len(row_text), letters - row["start"]))
+            if target <= row["letters_typed"]:
+                continue
+            if target == len(row_text): # Complete rows are rendered properly once, kerning included
+                row["surface"] = self.titlefont.render(row_text, True, CST.COLOR_WHITE)
+            else:
+                for index in range(row["letters_typed"], target):
+                    glyph_x = self.titlefont.size(row_text[:index])[0]
+                    # White on transparent: MAX blending keeps glyph edges exact where boxes overlap
+                    row["surface"].blit(self._get_glyph(row_text[index]), (glyph_x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            row["letters_typed"] = target
+        self.letters_revealed = letters
 
 
     def _rowify(self, new_text: str) -> list:
         """ Splits the entire text into shorter rows """
-        final_row_list = []
-        for phrase in new_text.split('\n'):
-            max_width = self._calculate_max_width(phrase, CST.SCREEN_WIDTH)
-            while len(phrase) > max_width:
-                if ' ' in phrase[:max_width]:
-                    right_space = phrase[:max_width].rfind(' ')
-                else:
-                    right_space = max_width
-
-                final_row_list.append(phrase[:right_space].strip())
-                phrase = phrase[right_space:].lstrip()
-            final_row_list.append(phrase)
-        return final_row_list
-
-
-    def _calculate_max_width(self, text: str, right_limit: int) -> int:
-        """ Calculates how many characters a text can have without breaking the right limit """
-        max_chars = len(text)
-        while self.titlefont.size(text[:max_chars])[0]+self.pos_x >= right_limit:
-            max_chars -= 1
-        return max_chars
+        return list(wrap_text(*self.font_key, new_text, CST.SCREEN_WIDTH - self.pos_x))
 
 
     def set_text(self, new_text: str) -> None:
@@ -121,7 +191,7 @@ class AnimatedTypedText:
     def play_sound_effect(self) -> None:
         current_letter_index = min(self.letters_shown, len(self.total_text)-1)
         if self.total_text[current_letter_index] != ' ':
-            self.sfx_text_tick.play()
+            vmg.VoiceManager.play(self.sfx_text_tick, "text")
 
 
     def game_tick_update(self, window: pygame.Surface) -> None:
@@ -135,11 +205,9 @@ class AnimatedTypedText:
                 self.frame_counter = 0
                 self.letters_shown += 1
                 self.play_sound_effect()
-            self._generate_row_surfaces(self.total_text[:self.letters_shown])
-        
-        for row in self.rows_and_rects.keys():
-            this_row = self.titlefont.render(row, True, CST.COLOR_WHITE)
-            window.blit(this_row, self.rows_and_rects[row])
+        self._reveal_letters(self.letters_shown) # Does nothing unless new letters showed up
+
+        window.blits([(row["surface"], row["rect"]) for row in self.rows if row["letters_typed"]], False)
 
 
 
@@ -0,0 +1,102 @@
+# SpaceStoneDodger: Voice Manager
+# Every sound effect goes through here: each category gets its own reserved
+# mixer channels, so a burst of one kind of sound can't silence the others
+
+import pygame
+import time as t
+import ssd_constants as CST
+
+
+
+class VoiceManager:
+    """ Plays sounds on per-category channel budgets, with priorities, rate limiting and voice stealing """
+
+    categories = {} # Category names as keys, {"channels", "min_interval", "last_play", "last_priority"} as values
+    voices = {} # Channel ids as keys, (priority, start time) of what they're playing as values
+    stats = {} # Category names as keys, counters as values
+
+    @classmethod
+    def setup(cls, budgets: dict = None) -> None:
+        """ Reserves the mixer channels for every category, budgets are like CST.SFX_CHANNEL_BUDGETS """
+        CST.ensure_mixer()
+        budgets = CST.SFX_CHANNEL_BUDGETS if budgets is None else budgets
+        total_channels = sum(channels for channels, _ in budgets.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total_channels))
+        pygame.mixer.set_reserved(total_channels) # Sound.play() outside of here won't pick them
+
+        cls.categories, cls.voices, cls.stats = {}, {}, {}
+        first_channel = 0
+        for category, (channels, min_interval) in budgets.items():
+            cls.categories[category] = {
+                "channels": list(range(first_channel, first_channel + channels)),
+                "min_interval": min_interval,
+                "last_play": -min_interval,
+                "last_priority": 0,
+            }
+            cls.stats[category] = {"played": 0, "stolen": 0, "rate_limited": 0, "no_voice": 0, "peak_voices": 0}
+            first_channel += channels
+
+
+    @classmethod
+    def play(cls, sound: pygame.mixer.Sound, category: str, priority: int = 0):
+        """ Plays a sound in a category, returns the channel used or None if it was dropped
+            Higher priority sounds skip the rate limit and can steal voices from lower ones """
+        if not cls.categories:
+            cls.setup()
+        this_category = cls.categories[category]
+        stats = cls.stats[category]
+        now = t.perf_counter()
+
+        too_soon = now - this_category["last_play"] < this_category["min_interval"]
+        if too_soon and priority <= this_category["last_priority"]:
+            stats["rate_limited"] += 1
+            return None
+
+        channel_id = cls._pick_voice(this_category["channels"], priority)
+        if channel_id is None:
+            stats["no_voice"] += 1
+            return None
+        channel = pygame.mixer.Channel(channel_id)
+        if channel.get_busy():
+            stats["stolen"] += 1
+        channel.play(sound)
+        cls.voices[channel_id] = (priority, now)
+        this_category["last_play"] = now
+        this_category["last_priority"] = priority
+        stats["played"] += 1
+        stats["peak_voices"] = max(stats["peak_voices"], cls._busy_voices(this_category["channels"]))
+        return channel
+
+
+    @classmethod
+    def _pick_voice(cls, channel_ids: list, priority: int) -> int:
+        """ Returns a free channel, or the one playing the least important and oldest sound
+            if this priority is at least as high, None otherwise """
+        busy = []
+        for channel_id in channel_ids:
+            if not pygame.mixer.Channel(channel_id).get_busy():
+                return channel_id
+            busy.append(cls.voices.get(channel_id, (0, 0.0)) + (channel_id,))
+        victim_priority, _, victim_id = min(busy)
+        if victim_priority > priority:
+            return None
+        return victim_id
+
+
+    @classmethod
+    def _busy_voices(cls, channel_ids: list) -> int:
+        return sum(1 for channel_id in channel_ids if pygame.mixer.Channel(channel_id).get_busy())
+
+
+    @classmethod
+    def get_utilization(cls) -> dict:
+        """ Returns how much of its budget every category is using right now (0.0 to 1.0) """
+        return {category: cls._busy_voices(this_category["channels"]) / len(this_category["channels"])
+                for category, this_category in cls.categories.items()}
+
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """ Returns the counters of every category, with its current utilization """
+        utilization = cls.get_utilization()
+        return {category: dict(stats, utilization=utilization[category]) for category, stats in cls.stats.items()}